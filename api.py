@@ -5,17 +5,34 @@ Provides REST API endpoints for the Flutter frontend.
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator, AsyncIterator
+from collections import OrderedDict
 import asyncio
-import json
+import hashlib
+import logging
+import os
+import threading
+import time
+import orjson
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+
+# Qdrant transport errors: REST, plus gRPC when QDRANT_PREFER_GRPC=1
+# (grpc.aio.AioRpcError subclasses grpc.RpcError)
+try:
+    from grpc import RpcError
+    _QDRANT_ERRORS: Tuple[type, ...] = (ResponseHandlingException, UnexpectedResponse, RpcError)
+except ImportError:
+    _QDRANT_ERRORS = (ResponseHandlingException, UnexpectedResponse)
 
 from config import MODULES, get_module_config
 from document_loader import create_folder_processor
 from vector_store import create_vector_store_manager, VectorStoreManager
 from rag_chain import create_rag_chain, RAGChainBuilder, RAGQueryHandler
 
+logger = logging.getLogger(__name__)
+
 # =============================================================================
 # FastAPI App Setup
 # =============================================================================
@@ -23,7 +40,8 @@ from rag_chain import create_rag_chain, RAGChainBuilder, RAGQueryHandler
 app = FastAPI(
     title="IYYA API",
     description="Backend API for IYYA - Assistant Juridique Marocain",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for Flutter Web
@@ -35,18 +53,72 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Streaming: flush buffered tokens every N chunks or every T seconds
+STREAM_FLUSH_CHUNKS = 8
+STREAM_FLUSH_INTERVAL = 0.025
+# Max chunks buffered between the LLM producer thread and the response
+STREAM_QUEUE_SIZE = 64
+
+# SSE framing, pre-encoded so frames are assembled as bytes
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_DONE_FRAME = _SSE_PREFIX + orjson.dumps({"done": True}) + _SSE_SUFFIX
+# Ask reverse proxies (nginx, CDNs) not to buffer or cache the event stream
+_SSE_HEADERS = {
+    "X-Accel-Buffering": "no",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive"
+}
+
 # =============================================================================
 # In-memory cache for loaded modules
 # =============================================================================
 
-_module_resources: Dict[str, Dict[str, Any]] = {}
+class ModuleResourceCache:
+    """
+    Bounded LRU cache of loaded module resources.
+    Safe to use from worker threads as well as the event loop.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __contains__(self, module_id: str) -> bool:
+        with self._lock:
+            return module_id in self._entries
+    
+    def get(self, module_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(module_id)
+            if entry is None:
+                return None
+            # Failure entries carry an expiry so the build is retried later
+            if "expires" in entry and entry["expires"] < time.monotonic():
+                del self._entries[module_id]
+                return None
+            self._entries.move_to_end(module_id)
+            return entry
+    
+    def put(self, module_id: str, entry: Dict[str, Any]):
+        """Store an entry, evicting the least recently used ones if needed."""
+        with self._lock:
+            self._entries[module_id] = entry
+            self._entries.move_to_end(module_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
 
 
-def get_module_resources(module_id: str) -> Dict[str, Any]:
-    """Load and cache module resources."""
-    if module_id in _module_resources:
-        return _module_resources[module_id]
-    
+_module_resources = ModuleResourceCache(maxsize=int(os.getenv("IYYA_MODULE_CACHE", "8")))
+# Seconds a failed module load is cached before the next retry
+MODULE_ERROR_TTL = 5.0
+_module_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _build_module_resources(module_id: str) -> Dict[str, Any]:
+    """Build module resources (blocking: talks to Qdrant and OpenAI)."""
     try:
         module_config = get_module_config(module_id)
         
@@ -57,6 +129,7 @@ def get_module_resources(module_id: str) -> Dict[str, Any]:
         collection_info = vs_manager.get_collection_info()
         
         if not collection_info["exists"] or collection_info["count"] == 0:
+            vs_manager.close()
             return {
                 "success": False,
                 "error": f"La base vectorielle est vide. Exécutez: python sync_documents.py --module {module_id}",
@@ -65,11 +138,25 @@ def get_module_resources(module_id: str) -> Dict[str, Any]:
                 "rag_chain": None
             }
         
+        # A collection built before an embedding size change would fail every search
+        if not vs_manager.has_expected_vector_size():
+            vs_manager.close()
+            return {
+                "success": False,
+                "error": (
+                    "La base vectorielle a été construite avec une autre taille d'embedding. "
+                    f"Exécutez: python sync_documents.py --module {module_id}"
+                ),
+                "num_vectors": 0,
+                "vs_manager": None,
+                "rag_chain": None
+            }
+        
         # Create RAG chain
         rag_chain = create_rag_chain(vs_manager, module_config)
         query_handler = RAGQueryHandler(rag_chain, module_id)
         
-        _module_resources[module_id] = {
+        return {
             "success": True,
             "error": None,
             "num_vectors": collection_info["count"],
@@ -78,9 +165,9 @@ def get_module_resources(module_id: str) -> Dict[str, Any]:
             "query_handler": query_handler
         }
         
-        return _module_resources[module_id]
-        
-    except Exception as e:
+    except (ConnectionError, ValueError, *_QDRANT_ERRORS) as e:
+        # Qdrant unreachable/erroring or missing API key; anything else is a
+        # bug and propagates to FastAPI
         return {
             "success": False,
             "error": str(e),
@@ -90,6 +177,163 @@ def get_module_resources(module_id: str) -> Dict[str, Any]:
         }
 
 
+async def get_module_resources(module_id: str) -> Dict[str, Any]:
+    """Load and cache module resources without blocking the event loop."""
+    resources = _module_resources.get(module_id)
+    if resources is not None:
+        return resources
+    
+    # One lock per module so concurrent first hits don't build the chain twice
+    lock = _module_locks.get(module_id)
+    if lock is None:
+        lock = _module_locks[module_id] = asyncio.Lock()
+    
+    async with lock:
+        resources = _module_resources.get(module_id)
+        if resources is not None:
+            return resources
+        
+        resources = await asyncio.to_thread(_build_module_resources, module_id)
+        if not resources["success"]:
+            # Cache failures briefly so a degraded Qdrant isn't hammered by
+            # a rebuild on every request
+            resources["expires"] = time.monotonic() + MODULE_ERROR_TTL
+        _module_resources.put(module_id, resources)
+        return resources
+
+
+# =============================================================================
+# In-flight request coalescing
+# =============================================================================
+
+_inflight_requests: Dict[Tuple[str, str], "asyncio.Future[Dict[str, Any]]"] = {}
+
+
+async def _ask_coalesced(module_id: str, message: str, func: Callable, *args) -> Dict[str, Any]:
+    """
+    Run func(*args) in a worker thread, sharing the result with concurrent
+    requests for the same (module_id, message).
+    """
+    key = (module_id, hashlib.blake2b(message.encode(), digest_size=16).hexdigest())
+    
+    task = _inflight_requests.get(key)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        _inflight_requests[key] = task
+        task.add_done_callback(lambda _: _inflight_requests.pop(key, None))
+    
+    # Shield so a disconnecting client doesn't cancel the shared work
+    return await asyncio.shield(task)
+
+
+async def _warm_module_resources():
+    """Load every enabled module so first requests hit a warm cache."""
+    module_ids = [mid for mid, config in MODULES.items() if config.get("enabled", True)]
+    results = await asyncio.gather(
+        *(get_module_resources(mid) for mid in module_ids),
+        return_exceptions=True
+    )
+    for module_id, result in zip(module_ids, results):
+        if isinstance(result, Exception):
+            logger.warning("Warm-up failed for module '%s': %s", module_id, result)
+        elif not result["success"]:
+            logger.warning("Warm-up failed for module '%s': %s", module_id, result["error"])
+
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def warm_modules_on_startup():
+    """Start warming module resources in the background (doesn't delay startup)."""
+    global _warmup_task
+    _warmup_task = asyncio.create_task(_warm_module_resources())
+
+
+# =============================================================================
+# Streaming pipeline
+# =============================================================================
+
+_STREAM_END = object()
+
+
+def _produce_into_queue(
+    iterator: Iterator[str],
+    queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event
+):
+    """Drain a blocking iterator from a worker thread into an asyncio queue."""
+    def put(item):
+        # Blocks this thread while the queue is full (backpressure)
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+    
+    try:
+        for chunk in iterator:
+            if stop.is_set():
+                break
+            put(chunk)
+        put(_STREAM_END)
+    except Exception as e:
+        put(e)
+
+
+async def _iterate_in_thread(iterator: Iterator[str]) -> AsyncIterator[str]:
+    """
+    Iterate a blocking generator without blocking the event loop.
+    Production runs in a worker thread so the next chunk is generated while
+    the previous one is being sent to the client.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    stop = threading.Event()
+    loop.run_in_executor(None, _produce_into_queue, iterator, queue, loop, stop)
+    
+    try:
+        while (item := await queue.get()) is not _STREAM_END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Client went away or stream ended: stop the producer and unblock
+        # any pending put so the worker thread can exit
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
+
+
+async def _error_frames(error: str) -> AsyncIterator[bytes]:
+    """SSE body for a request that failed before streaming started."""
+    yield _SSE_PREFIX + orjson.dumps({"error": error}) + _SSE_SUFFIX
+
+
+async def _stream_frames(
+    query_handler: RAGQueryHandler,
+    message: str,
+    history: List[Dict[str, str]]
+) -> AsyncIterator[bytes]:
+    """
+    SSE body for a streamed answer.
+    Tokens are coalesced into one frame per N chunks or T seconds.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        buffer: List[str] = []
+        last_flush = loop.time()
+        chunks = query_handler.stream(message, conversation_history=history)
+        async for chunk in _iterate_in_thread(chunks):
+            buffer.append(chunk)
+            if len(buffer) >= STREAM_FLUSH_CHUNKS or loop.time() - last_flush >= STREAM_FLUSH_INTERVAL:
+                yield _SSE_PREFIX + orjson.dumps({"chunk": "".join(buffer)}) + _SSE_SUFFIX
+                buffer.clear()
+                last_flush = loop.time()
+        if buffer:
+            yield _SSE_PREFIX + orjson.dumps({"chunk": "".join(buffer)}) + _SSE_SUFFIX
+        yield _DONE_FRAME
+    except Exception as e:
+        yield _SSE_PREFIX + orjson.dumps({"error": str(e)}) + _SSE_SUFFIX
+
+
 # =============================================================================
 # Request/Response Models
 # =============================================================================
@@ -123,6 +367,12 @@ class ChatRequest(BaseModel):
     module_id: str
     message: str
     conversation_history: List[ChatMessage] = []
+    
+    def history_dicts(self) -> List[Dict[str, str]]:
+        """Conversation history as plain role/content dicts (read-only views)."""
+        # ChatMessage only has role/content, so the instance dict is exactly
+        # the payload the RAG handler expects; no per-field copy needed
+        return [msg.__dict__ for msg in self.conversation_history]
 
 
 class ChatResponse(BaseModel):
@@ -131,6 +381,38 @@ class ChatResponse(BaseModel):
     error: Optional[str]
 
 
+# =============================================================================
+# Precomputed static response bodies (MODULES is static for the process lifetime)
+# =============================================================================
+
+def _module_info(module_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the public ModuleInfo payload for a module."""
+    return {
+        "id": module_id,
+        "name": config["name"],
+        "short_name": config["short_name"],
+        "description": config["description"],
+        "icon": config["icon"],
+        "color": config["color"],
+        "enabled": config.get("enabled", True)
+    }
+
+
+_MODULE_JSON: Dict[str, bytes] = {
+    module_id: orjson.dumps(_module_info(module_id, config))
+    for module_id, config in MODULES.items()
+}
+_HEALTH_JSON: bytes = orjson.dumps({"status": "ok", "message": "IYYA API is running"})
+_MODULES_JSON: bytes = orjson.dumps({
+    "modules": [_module_info(module_id, config) for module_id, config in MODULES.items()]
+})
+
+
+def _chat_response(success: bool, answer: Optional[str], error: Optional[str]) -> ORJSONResponse:
+    """Build a ChatResponse-shaped body without Pydantic validation."""
+    return ORJSONResponse({"success": success, "answer": answer, "error": error})
+
+
 # =============================================================================
 # API Endpoints
 # =============================================================================
@@ -138,24 +420,13 @@ class ChatResponse(BaseModel):
 @app.get("/")
 async def root():
     """Health check endpoint."""
-    return {"status": "ok", "message": "IYYA API is running"}
+    return Response(content=_HEALTH_JSON, media_type="application/json")
 
 
 @app.get("/api/modules", response_model=ModulesResponse)
 async def get_modules():
     """Get all available modules."""
-    modules = []
-    for module_id, config in MODULES.items():
-        modules.append(ModuleInfo(
-            id=module_id,
-            name=config["name"],
-            short_name=config["short_name"],
-            description=config["description"],
-            icon=config["icon"],
-            color=config["color"],
-            enabled=config.get("enabled", True)
-        ))
-    return ModulesResponse(modules=modules)
+    return Response(content=_MODULES_JSON, media_type="application/json")
 
 
 @app.get("/api/modules/{module_id}", response_model=ModuleInfo)
@@ -164,16 +435,7 @@ async def get_module(module_id: str):
     if module_id not in MODULES:
         raise HTTPException(status_code=404, detail=f"Module '{module_id}' not found")
     
-    config = MODULES[module_id]
-    return ModuleInfo(
-        id=module_id,
-        name=config["name"],
-        short_name=config["short_name"],
-        description=config["description"],
-        icon=config["icon"],
-        color=config["color"],
-        enabled=config.get("enabled", True)
-    )
+    return Response(content=_MODULE_JSON[module_id], media_type="application/json")
 
 
 @app.get("/api/modules/{module_id}/status", response_model=ModuleStatusResponse)
@@ -182,12 +444,12 @@ async def get_module_status(module_id: str):
     if module_id not in MODULES:
         raise HTTPException(status_code=404, detail=f"Module '{module_id}' not found")
     
-    resources = get_module_resources(module_id)
-    return ModuleStatusResponse(
-        success=resources["success"],
-        error=resources.get("error"),
-        num_vectors=resources["num_vectors"]
-    )
+    resources = await get_module_resources(module_id)
+    return ORJSONResponse({
+        "success": resources["success"],
+        "error": resources.get("error"),
+        "num_vectors": resources["num_vectors"]
+    })
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -196,10 +458,13 @@ async def chat(request: ChatRequest):
     if request.module_id not in MODULES:
         raise HTTPException(status_code=404, detail=f"Module '{request.module_id}' not found")
     
-    resources = get_module_resources(request.module_id)
+    # Warm path: one cache lookup, no coroutine; cold path builds under the lock
+    resources = _module_resources.get(request.module_id)
+    if resources is None:
+        resources = await get_module_resources(request.module_id)
     
     if not resources["success"]:
-        return ChatResponse(
+        return _chat_response(
             success=False,
             answer=None,
             error=resources["error"]
@@ -209,19 +474,27 @@ async def chat(request: ChatRequest):
         query_handler: RAGQueryHandler = resources["query_handler"]
         
         # Convert conversation history
-        history = [{"role": msg.role, "content": msg.content} for msg in request.conversation_history]
+        history = request.history_dicts()
         
-        # Get response
-        result = query_handler.ask(request.message, conversation_history=history)
+        if len(history) <= 1:
+            # Standalone question: coalesce with identical in-flight requests
+            # (the handler's semantic cache serves later paraphrases; answers
+            # to follow-ups depend on the conversation, so those skip both)
+            result = await _ask_coalesced(
+                request.module_id, request.message, query_handler.ask, request.message
+            )
+        else:
+            # Worker thread: parts of the handler's path are still blocking
+            result = await asyncio.to_thread(query_handler.ask, request.message, history)
         
-        return ChatResponse(
+        return _chat_response(
             success=result["success"],
             answer=result.get("answer"),
             error=result.get("error")
         )
         
     except Exception as e:
-        return ChatResponse(
+        return _chat_response(
             success=False,
             answer=None,
             error=str(e)
@@ -234,26 +507,23 @@ async def chat_stream(request: ChatRequest):
     if request.module_id not in MODULES:
         raise HTTPException(status_code=404, detail=f"Module '{request.module_id}' not found")
     
-    resources = get_module_resources(request.module_id)
+    # Warm path: one cache lookup, no coroutine; cold path builds under the lock
+    resources = _module_resources.get(request.module_id)
+    if resources is None:
+        resources = await get_module_resources(request.module_id)
     
     if not resources["success"]:
-        async def error_generator():
-            yield f"data: {json.dumps({'error': resources['error']})}\n\n"
-        return StreamingResponse(error_generator(), media_type="text/event-stream")
-    
-    query_handler: RAGQueryHandler = resources["query_handler"]
-    history = [{"role": msg.role, "content": msg.content} for msg in request.conversation_history]
-    
-    async def generate():
-        try:
-            for chunk in query_handler.stream(request.message, conversation_history=history):
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-                await asyncio.sleep(0)  # Allow other tasks to run
-            yield f"data: {json.dumps({'done': True})}\n\n"
-        except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        return StreamingResponse(
+            _error_frames(resources["error"]),
+            media_type="text/event-stream",
+            headers=_SSE_HEADERS
+        )
     
-    return StreamingResponse(generate(), media_type="text/event-stream")
+    return StreamingResponse(
+        _stream_frames(resources["query_handler"], request.message, request.history_dicts()),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS
+    )
 
 
 # =============================================================================
@@ -262,4 +532,13 @@ async def chat_stream(request: ChatRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=75,  # Reuse connections across chat turns (mobile clients)
+        limit_concurrency=1024,
+        backlog=2048
+    )
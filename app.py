@@ -250,6 +250,16 @@ def set_current_module(module_id: str):
         ]
 
 
+def clear_conversation(module_id: str):
+    """
+    Keep only the greeting message of a module's conversation.
+    
+    Used as a button callback: it runs before the rerun triggered by the
+    click, so the cleared history renders without a second st.rerun().
+    """
+    del st.session_state.messages[module_id][1:]
+
+
 def go_back_to_home():
     """Return to the home page."""
     st.session_state.current_module = None
@@ -259,44 +269,77 @@ def go_back_to_home():
 # Cached Resources
 # =============================================================================
 
+class ModuleNotReadyError(Exception):
+    """Raised when a module's collection is missing or empty."""
+    pass
+
+
 @st.cache_resource(show_spinner=False)
+def get_vector_store_manager(module_id: str) -> VectorStoreManager:
+    """Get or create the vector store manager (Qdrant client) for a module."""
+    return create_vector_store_manager(get_module_config(module_id))
+
+
+@st.cache_resource(show_spinner=False)
+def get_folder_processor(module_id: str) -> FolderDocumentProcessor:
+    """Get or create the document processor for a module."""
+    return create_folder_processor(get_module_config(module_id))
+
+
+@st.cache_resource(show_spinner=False)
+def _load_ready_module(module_id: str) -> Tuple[int, VectorStoreManager]:
+    """
+    Check a module's collection once and cache it when ready.
+    Raises ModuleNotReadyError otherwise (exceptions are not cached, so the
+    check is retried on the next rerun, e.g. after running the sync script).
+    """
+    module_config = get_module_config(module_id)
+    vs_manager = get_vector_store_manager(module_id)
+    
+    # Check if collection exists and has vectors
+    collection_info = vs_manager.get_collection_info()
+    
+    if collection_info["exists"] and collection_info["count"] > 0:
+        # A collection built before an embedding size change would fail every search
+        if not vs_manager.has_expected_vector_size():
+            raise ModuleNotReadyError(
+                f"La base vectorielle a été construite avec une autre taille d'embedding. "
+                f"Exécutez: python sync_documents.py --module {module_id}"
+            )
+        # Collection exists with data - ready to use
+        return collection_info["count"], vs_manager
+    
+    # Collection is empty or doesn't exist - need to sync documents first
+    # Check if there are documents to process
+    pdf_files = get_folder_processor(module_id).get_pdf_files()
+    
+    if not pdf_files:
+        raise ModuleNotReadyError(
+            f"Aucun document trouvé dans le dossier '{module_config['documents_folder']}'. "
+            f"Ajoutez des fichiers PDF et exécutez: python sync_documents.py --module {module_id}"
+        )
+    
+    # Documents exist but not synced - prompt user to sync
+    raise ModuleNotReadyError(
+        f"La base vectorielle est vide. "
+        f"Exécutez: python sync_documents.py --module {module_id}"
+    )
+
+
 def load_module_resources(module_id: str) -> Tuple[bool, Optional[str], int, Optional[VectorStoreManager]]:
     """
-    Load and cache resources for a specific module.
+    Load resources for a specific module (cached once ready).
     Uses Qdrant for vector storage (local or cloud).
     
     Returns:
         Tuple of (success, error_message, num_vectors, vector_store_manager)
     """
     try:
-        module_config = get_module_config(module_id)
-        
-        # Create vector store manager (Qdrant)
-        vs_manager = create_vector_store_manager(module_config)
+        num_vectors, vs_manager = _load_ready_module(module_id)
+        return True, None, num_vectors, vs_manager
         
-        # Check if collection exists and has vectors
-        collection_info = vs_manager.get_collection_info()
-        
-        if collection_info["exists"] and collection_info["count"] > 0:
-            # Collection exists with data - ready to use
-            return True, None, collection_info["count"], vs_manager
-        
-        # Collection is empty or doesn't exist - need to sync documents first
-        # Check if there are documents to process
-        doc_processor = create_folder_processor(module_config)
-        pdf_files = doc_processor.get_pdf_files()
-        
-        if not pdf_files:
-            return False, (
-                f"Aucun document trouvé dans le dossier '{module_config['documents_folder']}'. "
-                f"Ajoutez des fichiers PDF et exécutez: python sync_documents.py --module {module_id}"
-            ), 0, None
-        
-        # Documents exist but not synced - prompt user to sync
-        return False, (
-            f"La base vectorielle est vide. "
-            f"Exécutez: python sync_documents.py --module {module_id}"
-        ), 0, None
+    except ModuleNotReadyError as e:
+        return False, str(e), 0, None
         
     except Exception as e:
         error_msg = str(e)
@@ -318,6 +361,12 @@ def get_rag_chain(_vs_manager: VectorStoreManager, module_id: str, version: str
     return create_rag_chain(_vs_manager, module_config)
 
 
+@st.cache_resource(show_spinner=False)
+def get_query_handler(_rag_chain: RAGChainBuilder, module_id: str, version: str = RAG_CHAIN_VERSION) -> RAGQueryHandler:
+    """Get or create the query handler for a module's RAG chain."""
+    return RAGQueryHandler(_rag_chain, module_id)
+
+
 # =============================================================================
 # Home Page
 # =============================================================================
@@ -403,6 +452,55 @@ def render_home_page():
 # Chat Page
 # =============================================================================
 
+# Example questions shown in the sidebar, per module
+_EXAMPLE_QUESTIONS = {
+    "cgi": (
+        "Quel est le taux d'IS ?",
+        "Exonérations de TVA ?",
+        "Régime auto-entrepreneur ?"
+    ),
+}
+_DEFAULT_EXAMPLE_QUESTIONS = (
+    "Durée du préavis ?",
+    "Calcul des congés payés ?",
+    "Indemnité de licenciement ?"
+)
+
+
+@st.cache_data
+def _sidebar_header_markdown(module_id: str) -> str:
+    """Build the static sidebar block shown above the back button."""
+    module_config = get_module_config(module_id)
+    return (
+        f"### {module_config['icon']} {module_config['name']}\n\n"
+        f"_{module_config['description']}_\n\n"
+        "---"
+    )
+
+
+@st.cache_data
+def _sidebar_footer_markdown(module_id: str) -> str:
+    """Build the static sidebar block shown below the back button."""
+    examples = _EXAMPLE_QUESTIONS.get(module_id, _DEFAULT_EXAMPLE_QUESTIONS)
+    return "\n\n".join([
+        "---",
+        "**Exemples de questions :**",
+        "\n".join(f"- _{ex}_" for ex in examples),
+        "---",
+        '<div class="powered-by">Powered by <a href="https://wearebeebay.com">wearebeebay</a></div>'
+    ])
+
+
+@st.cache_data
+def _chat_header_html(module_id: str) -> str:
+    """Build the chat page title and subtitle as a single HTML block."""
+    module_config = get_module_config(module_id)
+    return (
+        f'<h1 class="main-title">{module_config["icon"]} {module_config["short_name"]}</h1>\n'
+        f'<p class="subtitle">{module_config["name"]}</p>'
+    )
+
+
 def render_chat_page(module_id: str):
     """Render the chat interface for a specific module."""
     
@@ -410,38 +508,13 @@ def render_chat_page(module_id: str):
     
     # Sidebar with info and back button
     with st.sidebar:
-        st.markdown(f"### {module_config['icon']} {module_config['name']}")
-        st.markdown(f"_{module_config['description']}_")
-        
-        st.markdown("---")
+        st.markdown(_sidebar_header_markdown(module_id))
         
         if st.button("← Retour à l'accueil", use_container_width=True):
             go_back_to_home()
             st.rerun()
         
-        st.markdown("---")
-        
-        st.markdown("**Exemples de questions :**")
-        if module_id == "cgi":
-            examples = [
-                "Quel est le taux d'IS ?",
-                "Exonérations de TVA ?",
-                "Régime auto-entrepreneur ?"
-            ]
-        else:
-            examples = [
-                "Durée du préavis ?",
-                "Calcul des congés payés ?",
-                "Indemnité de licenciement ?"
-            ]
-        for ex in examples:
-            st.markdown(f"- _{ex}_")
-        
-        st.markdown("---")
-        st.markdown(
-            '<div class="powered-by">Powered by <a href="https://wearebeebay.com">wearebeebay</a></div>',
-            unsafe_allow_html=True
-        )
+        st.markdown(_sidebar_footer_markdown(module_id), unsafe_allow_html=True)
     
     # Main content - Back button at the top
     col_back, col_spacer = st.columns([1, 5])
@@ -450,14 +523,7 @@ def render_chat_page(module_id: str):
             go_back_to_home()
             st.rerun()
     
-    st.markdown(
-        f'<h1 class="main-title">{module_config["icon"]} {module_config["short_name"]}</h1>',
-        unsafe_allow_html=True
-    )
-    st.markdown(
-        f'<p class="subtitle">{module_config["name"]}</p>',
-        unsafe_allow_html=True
-    )
+    st.markdown(_chat_header_html(module_id), unsafe_allow_html=True)
     
     # Load module resources
     with st.spinner(f"🔄 Chargement de la base {module_config['short_name']}..."):
@@ -473,7 +539,7 @@ def render_chat_page(module_id: str):
     
     # Initialize RAG chain
     rag_chain = get_rag_chain(vs_manager, module_id)
-    query_handler = RAGQueryHandler(rag_chain, module_id)
+    query_handler = get_query_handler(rag_chain, module_id)
     
     st.markdown("---")
     
@@ -506,9 +572,12 @@ def render_chat_page(module_id: str):
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
-        if st.button("🗑️ Nouvelle conversation", use_container_width=True):
-            st.session_state.messages[module_id] = [st.session_state.messages[module_id][0]]
-            st.rerun()
+        st.button(
+            "🗑️ Nouvelle conversation",
+            use_container_width=True,
+            on_click=clear_conversation,
+            args=(module_id,)
+        )
 
 
 # =============================================================================
@@ -5,36 +5,95 @@ Uses Qdrant for vector storage with folder-based document management.
 """
 
 import os
-from dataclasses import dataclass
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Final
 
+import httpx
 
-@dataclass(frozen=True)
-class ChunkingConfig:
-    """Configuration for document chunking."""
-    CHUNK_SIZE: int = 1500
-    CHUNK_OVERLAP: int = 300
 
+# =============================================================================
+# Chunking (sizes are in tokens)
+# =============================================================================
+
+TOKEN_ENCODING: Final[str] = "cl100k_base"
+CHUNK_SIZE_TOKENS: Final[int] = 512
+CHUNK_OVERLAP_TOKENS: Final[int] = 64
+
+
+# =============================================================================
+# OpenAI models
+# =============================================================================
+
+EMBEDDING_MODEL: Final[str] = "text-embedding-3-small"
+# Matryoshka truncation of text-embedding-3-small (native size is 1536)
+EMBEDDING_DIM: Final[int] = 512
+# Texts per embeddings request (OpenAI accepts up to 2048 inputs)
+EMBEDDING_BATCH_SIZE: Final[int] = 512
+# Estimated tokens per embeddings request (OpenAI rejects requests above 300k)
+EMBEDDING_BATCH_TOKENS: Final[int] = 250_000
+# Retries with exponential backoff on rate limits (429) and transient errors
+EMBEDDING_MAX_RETRIES: Final[int] = 6
+# Embeddings requests allowed in flight at once while indexing
+EMBEDDING_CONCURRENCY: Final[int] = 8
+# Query embeddings kept in memory per vector store manager
+QUERY_EMBEDDING_CACHE_SIZE: Final[int] = int(os.getenv("QDRANT_QUERY_CACHE_SIZE", "1024"))
+# Overridable per deployment instead of keeping diverging copies of this module
+LLM_MODEL: Final[str] = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_TEMPERATURE: Final[float] = float(os.getenv("LLM_TEMPERATURE", "0.2"))
+
+
+# =============================================================================
+# Qdrant vector database
+# For cloud: set QDRANT_URL and QDRANT_API_KEY in environment
+# =============================================================================
+
+QDRANT_HOST: Final[str] = "localhost"
+QDRANT_PORT: Final[int] = 6333
+# gRPC transport (QDRANT_PREFER_GRPC=1) needs the gRPC port reachable
+QDRANT_PREFER_GRPC: Final[bool] = os.getenv("QDRANT_PREFER_GRPC") == "1"
+QDRANT_GRPC_PORT: Final[int] = 6334
+# HNSW graph: denser links at build time, small candidate list at query time
+QDRANT_HNSW_M: Final[int] = 32
+QDRANT_HNSW_EF_CONSTRUCT: Final[int] = 200
+# Candidate list size per query (QDRANT_EF): higher trades latency for recall
+QDRANT_HNSW_EF_SEARCH: Final[int] = int(os.getenv("QDRANT_EF", "64"))
+# Quantization (QDRANT_QUANTIZATION, applied when a collection is created):
+# "scalar" searches int8 vectors at 1/4 of their size, "binary" 1-bit vectors
+# at 1/32 but coarser, so it rescores more candidates. Either way the top
+# candidates (limit x oversampling) are rescored on the original vectors
+QDRANT_QUANTIZATION: Final[str] = os.getenv("QDRANT_QUANTIZATION", "scalar")
+QDRANT_QUANTIZATION_OVERSAMPLING: Final[float] = 3.0 if QDRANT_QUANTIZATION == "binary" else 2.0
+# Segment size (kB) above which vectors get an HNSW index; 0 disables
+# indexing, which bulk loads use until all points are in
+QDRANT_INDEXING_THRESHOLD: Final[int] = 20000
 
-@dataclass(frozen=True)
-class ModelConfig:
-    """Configuration for OpenAI models."""
-    EMBEDDING_MODEL: str = "text-embedding-3-small"
-    LLM_MODEL: str = "gpt-4o-mini"
-    LLM_TEMPERATURE: float = 0.2
 
+# =============================================================================
+# Semantic answer cache
+# =============================================================================
 
-@dataclass(frozen=True)
-class QdrantConfig:
-    """Configuration for Qdrant vector database."""
-    HOST: str = "localhost"
-    PORT: int = 6333
-    # For cloud: set QDRANT_URL and QDRANT_API_KEY in environment
+# Minimum cosine similarity for reusing an answer. Questions differing only
+# in an article number or a year can score above it on 512-d embeddings;
+# raise it (SEMANTIC_CACHE_THRESHOLD) if such questions share answers
+SEMANTIC_CACHE_THRESHOLD: Final[float] = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES: Final[int] = 256
+# Seconds a cached answer is served; bounds staleness after a resync made
+# by another process (sync_documents.py), which can't invalidate it
+SEMANTIC_CACHE_TTL: Final[float] = float(os.getenv("SEMANTIC_CACHE_TTL", "600"))
+# Search results reused for near-identical queries (stricter than answers)
+SEARCH_CACHE_THRESHOLD: Final[float] = 0.97
+SEARCH_CACHE_MAX_ENTRIES: Final[int] = 512
+# Seconds cached search results are reused; writes through the same manager
+# clear them at once, this bounds staleness after an out-of-process resync
+SEARCH_CACHE_TTL: Final[float] = float(os.getenv("SEARCH_CACHE_TTL", "300"))
 
 
 # Base folder for all document modules
 DOCUMENTS_BASE_FOLDER = "./documents"
 
+# Chunk embeddings by content hash, reused across syncs and modules
+EMBEDDING_CACHE_FILE = os.path.join(DOCUMENTS_BASE_FOLDER, ".embedding_cache.sqlite")
+
 
 # =============================================================================
 # MODULE CONFIGURATIONS
@@ -138,6 +197,7 @@ RÉPONSE :"""
 }
 
 
+@lru_cache(maxsize=None)
 def get_module_config(module_id: str) -> Dict[str, Any]:
     """
     Get configuration for a specific module.
@@ -150,12 +210,15 @@ def get_module_config(module_id: str) -> Dict[str, Any]:
         
     Raises:
         ValueError: If module_id is not found
+        
+    Results are memoized: MODULES is static for the process lifetime.
     """
     if module_id not in MODULES:
         raise ValueError(f"Module '{module_id}' not found. Available: {list(MODULES.keys())}")
     return MODULES[module_id]
 
 
+@lru_cache(maxsize=1)
 def get_openai_api_key() -> str:
     """
     Retrieve OpenAI API key from environment or Streamlit secrets.
@@ -165,6 +228,9 @@ def get_openai_api_key() -> str:
         
     Raises:
         ValueError: If no API key is found
+        
+    The key is memoized once found (a missing key is not cached); call
+    get_openai_api_key.cache_clear() after rotating it.
     """
     api_key = os.getenv("OPENAI_API_KEY")
     
@@ -183,3 +249,20 @@ def get_openai_api_key() -> str:
         "Définissez OPENAI_API_KEY dans les variables d'environnement "
         "ou dans .streamlit/secrets.toml"
     )
+
+
+@lru_cache(maxsize=1)
+def get_openai_http_client() -> httpx.Client:
+    """
+    Get the HTTP client shared by every OpenAI chat and embeddings client.
+    
+    One pooled client keeps TLS connections alive across the query
+    rewriter, the answer LLM and the embeddings instead of each opening
+    its own.
+    
+    Returns:
+        httpx.Client: Process-wide pooled client
+    """
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    )
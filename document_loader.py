@@ -5,19 +5,433 @@ Supports multiple files per module with proper metadata tracking.
 Supported formats: PDF, DOC, DOCX
 """
 
+import mmap
+import multiprocessing
 import os
+import pickle
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, BinaryIO, Callable, Generator, Iterator, Optional, Tuple, Union
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
+from pypdf import PdfReader
+import tiktoken
 
-from config import ChunkingConfig
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from config import CHUNK_OVERLAP_TOKENS, CHUNK_SIZE_TOKENS, TOKEN_ENCODING
 
 # Supported file extensions
 SUPPORTED_EXTENSIONS = {'.pdf', '.doc', '.docx'}
 
+# PDFs larger than this are memory-mapped instead of read through a file buffer
+PDF_MMAP_THRESHOLD = 2 * 1024 * 1024
+
+# PDFs with more pages than this are extracted across a process pool
+PDF_PARALLEL_MIN_PAGES = 50
+
+# Files loaded in parallel by default (override with LOAD_DOCUMENTS_NUMBER_OF_THREADS)
+DEFAULT_LOAD_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+# PDFium is not thread-safe and its ctypes calls release the GIL: every
+# pypdfium2 call in a process goes through this lock
+_PDFIUM_LOCK = threading.Lock()
+
+# Files handled by a loader process before it is replaced (bounds parser memory growth)
+LOAD_WORKER_MAX_TASKS = 4
+
+# Pages buffered between the PDF loader thread and the splitter
+PAGE_QUEUE_SIZE = 8
+
+# Chunk cache database, stored in each documents folder
+CHUNK_CACHE_FILE = ".chunk_cache.sqlite"
+
+# Part of every chunk cache key: bump whenever text extraction or splitting
+# changes, so files chunked by the previous code are reprocessed
+LOADER_VERSION = 2
+
+# Chunk cache table layout (stored as the database's user_version)
+_CHUNK_CACHE_SCHEMA = 2
+
+# WordprocessingML element tags
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P, _W_T, _W_TBL, _W_TR, _W_TC = f"{_W}p", f"{_W}t", f"{_W}tbl", f"{_W}tr", f"{_W}tc"
+_W_BREAKS = {f"{_W}tab": "\t", f"{_W}br": "\n", f"{_W}cr": "\n"}
+
+
+def get_load_workers() -> int:
+    """Loader processes to use: LOAD_DOCUMENTS_NUMBER_OF_THREADS, else CPU count - 1."""
+    return max(1, int(os.getenv("LOAD_DOCUMENTS_NUMBER_OF_THREADS", DEFAULT_LOAD_WORKERS)))
+
+
+@contextmanager
+def _open_pdf_stream(pdf_path: Union[str, Path]) -> Iterator[Union[BinaryIO, mmap.mmap]]:
+    """
+    Open a PDF for parsing.
+    
+    Large files are memory-mapped so the parser pages in only the regions it
+    touches rather than holding a full copy of the file alongside the parsed
+    objects.
+    """
+    with open(pdf_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= PDF_MMAP_THRESHOLD:
+            yield f
+            return
+        
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+        finally:
+            mm.close()
+
+
+def _extract_pdf_pages(reader: PdfReader, source: str, start: int, end: int) -> List[Document]:
+    """Extract one Document per page in [start, end), mirroring PyPDFLoader's metadata."""
+    return [
+        Document(page_content=reader.pages[i].extract_text(), metadata={"source": source, "page": i})
+        for i in range(start, end)
+    ]
+
+
+def _extract_page_range(args: Tuple[str, int, int]) -> List[Document]:
+    """Extract a contiguous page range of a PDF (runs in a worker process)."""
+    source, start, end = args
+    with _open_pdf_stream(source) as stream:
+        return _extract_pdf_pages(PdfReader(stream), source, start, end)
+
+
+def _iter_pdf_pages_pdfium(pdf_path: Path, stats: Optional[Dict[str, int]] = None) -> Iterator[Document]:
+    """
+    Yield pages through PDFium's native text layer, one at a time.
+    
+    Pages without any text (scans, blank separators) are skipped before
+    extraction and counted in stats["skipped_pages"] when stats is given.
+    Safe to call from several threads: PDFium calls are serialized.
+    """
+    source = str(pdf_path)
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        page_count = len(pdf)
+    try:
+        for i in range(page_count):
+            # Held per page, not across the yield, so other threads' PDFs
+            # interleave page by page
+            with _PDFIUM_LOCK:
+                page = pdf[i]
+                textpage = page.get_textpage()
+                text = None
+                if textpage.count_chars() == 0:
+                    if stats is not None:
+                        stats["skipped_pages"] += 1
+                else:
+                    text = textpage.get_text_range().replace("\r\n", "\n")
+                textpage.close()
+                page.close()
+            if text is not None:
+                yield Document(page_content=text, metadata={"source": source, "page": i})
+    finally:
+        with _PDFIUM_LOCK:
+            pdf.close()
+
+
+def _load_pdf_pdfium(pdf_path: Path) -> List[Document]:
+    """Load all text pages through PDFium, recording the file's skipped_pages count on each."""
+    stats = {"skipped_pages": 0}
+    documents = list(_iter_pdf_pages_pdfium(pdf_path, stats))
+    for doc in documents:
+        doc.metadata["skipped_pages"] = stats["skipped_pages"]
+    return documents
+
+
+def load_pdf_pages(pdf_path: Path, max_workers: Optional[int] = None) -> List[Document]:
+    """
+    Load the pages of a PDF file.
+    
+    Uses pypdfium2 (native PDFium) when installed. Otherwise falls back to
+    pypdf, where long documents are split into contiguous page ranges
+    extracted in parallel worker processes, since pypdf's text extraction
+    is CPU-bound pure Python. Results are concatenated in page order.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        max_workers: Cap on page-extraction processes (1 disables the pool)
+        
+    Returns:
+        List[Document]: One document per page
+    """
+    if pdfium is not None:
+        return _load_pdf_pdfium(pdf_path)
+    
+    source = str(pdf_path)
+    with _open_pdf_stream(source) as stream:
+        reader = PdfReader(stream)
+        page_count = len(reader.pages)
+        workers = min(max_workers or os.cpu_count() or 1, page_count)
+        if page_count <= PDF_PARALLEL_MIN_PAGES or workers < 2:
+            return _extract_pdf_pages(reader, source, 0, page_count)
+    
+    step = -(-page_count // workers)
+    ranges = [(source, i, min(i + step, page_count)) for i in range(0, page_count, step)]
+    
+    # spawn avoids forking Streamlit/uvicorn state into the workers
+    with ProcessPoolExecutor(max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")) as executor:
+        return [doc for pages in executor.map(_extract_page_range, ranges) for doc in pages]
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Concatenate the runs of a w:p element (text, tabs and line breaks)."""
+    parts = []
+    for node in paragraph.iter(_W_T, *_W_BREAKS):
+        if node.tag == _W_T:
+            parts.append(node.text or "")
+        else:
+            parts.append(_W_BREAKS[node.tag])
+    return "".join(parts)
+
+
+def _read_docx_xml(doc_path: Path) -> Optional[str]:
+    """
+    Extract text from a .docx package by parsing word/document.xml with lxml.
+    
+    Walks the body in document order: non-empty paragraphs are kept as-is
+    and each table row becomes its non-empty cells joined with " | ".
+    
+    Returns:
+        The extracted text, or None if the package has no word/document.xml
+    """
+    with zipfile.ZipFile(doc_path) as archive:
+        try:
+            xml = archive.read("word/document.xml")
+        except KeyError:
+            return None
+    
+    root = etree.fromstring(xml, etree.XMLParser(resolve_entities=False, huge_tree=True))
+    body = root.find(f"{_W}body")
+    if body is None:
+        return None
+    
+    full_text = []
+    for element in body:
+        if element.tag == _W_P:
+            text = _docx_paragraph_text(element).strip()
+            if text:
+                full_text.append(text)
+        elif element.tag == _W_TBL:
+            for row in element.iterfind(_W_TR):
+                row_text = []
+                for cell in row.iterfind(_W_TC):
+                    cell_text = "\n".join(_docx_paragraph_text(p) for p in cell.iterfind(_W_P)).strip()
+                    if cell_text:
+                        row_text.append(cell_text)
+                if row_text:
+                    full_text.append(" | ".join(row_text))
+    
+    return "\n\n".join(full_text)
+
+
+def _prefetch_files(paths: List[Path]):
+    """
+    Ask the kernel to start reading files into the page cache.
+    
+    posix_fadvise(WILLNEED) queues asynchronous readahead for every file up
+    front, so later parses find their bytes already cached instead of
+    stalling on one read at a time. No-op where the call is unavailable.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+# Separators of the fast splitter, highest priority first (mirrors _get_splitter)
+_SEPARATOR_RE = re.compile(r"(\n\n|\n|\. | )")
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    """Get the tokenizer used to measure chunks."""
+    return tiktoken.get_encoding(TOKEN_ENCODING)
+
+
+@lru_cache(maxsize=32)
+def _compile_chunker(chunk_size: int, chunk_overlap: int) -> Callable[[str], List[str]]:
+    """
+    Build a single-pass chunker specialized for one (chunk_size, chunk_overlap) pair.
+    
+    The bounds, the separator regex and the tokenizer are bound as closure
+    constants once, so the packing loop does no attribute or global lookups.
+    """
+    split_units = _SEPARATOR_RE.split
+    encode_batch = _get_encoding().encode_ordinary_batch
+    
+    def chunk(text: str) -> List[str]:
+        pieces = split_units(text)
+        units = ["".join(pieces[i:i + 2]) for i in range(0, len(pieces), 2)]
+        lengths = [len(tokens) for tokens in encode_batch(units)]
+        
+        chunks = []
+        window: deque = deque()
+        window_length = 0
+        for unit, length in zip(units, lengths):
+            if window and window_length + length > chunk_size:
+                chunks.append("".join(u for u, _ in window).strip())
+                # Rewind to the overlap tail that still leaves room for this unit
+                while window and (window_length > chunk_overlap or window_length + length > chunk_size):
+                    window_length -= window.popleft()[1]
+            window.append((unit, length))
+            window_length += length
+        
+        if window:
+            chunks.append("".join(u for u, _ in window).strip())
+        return [c for c in chunks if c]
+    
+    return chunk
+
+
+def _fast_split(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Split text into token-bounded chunks in a single pass.
+    
+    One precompiled regex cuts the text into units ending at a separator,
+    all units are measured in one batched tiktoken call, then units are
+    greedily packed into chunks of at most chunk_size tokens, carrying up
+    to chunk_overlap tokens of trailing units into the next chunk.
+    
+    Unlike RecursiveCharacterTextSplitter it does not prefer paragraph
+    boundaries over word boundaries, and a single unit longer than
+    chunk_size is kept whole.
+    """
+    return _compile_chunker(chunk_size, chunk_overlap)(text)
+
+
+@lru_cache(maxsize=32)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """
+    Build a token-aware text splitter, shared across processors.
+    
+    Chunks are measured with the embedding model's tokenizer so each one
+    packs the embedding window instead of a character budget.
+    """
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=TOKEN_ENCODING,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+
+
+class ChunkCache:
+    """
+    SQLite-backed cache of chunked files.
+    
+    Entries are keyed by file path and only reused while the file's mtime
+    and size, the chunk settings and the loader (LOADER_VERSION, PDF
+    backend, splitter mode) are unchanged. Cache failures are treated as
+    misses so they never block loading.
+    """
+    
+    def __init__(self, db_path: Path):
+        """
+        Initialize the chunk cache.
+        
+        Args:
+            db_path: Path to the SQLite database file (created on first use)
+        """
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            # WAL lets parallel loader processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Caches written with an older layout are discarded
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _CHUNK_CACHE_SCHEMA:
+                conn.execute("DROP TABLE IF EXISTS chunks")
+                conn.execute(f"PRAGMA user_version = {_CHUNK_CACHE_SCHEMA}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "path TEXT PRIMARY KEY, mtime REAL, size INTEGER, "
+                "chunk_size INTEGER, chunk_overlap INTEGER, loader TEXT, blob BLOB)"
+            )
+            self._conn = conn
+        return self._conn
+    
+    def get(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        chunk_size: int,
+        chunk_overlap: int,
+        loader: str
+    ) -> Optional[List[Document]]:
+        """Return the cached chunks for an unchanged file, or None."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT blob FROM chunks WHERE path = ? AND mtime = ? AND size = ? "
+                    "AND chunk_size = ? AND chunk_overlap = ? AND loader = ?",
+                    (str(path), stat.st_mtime, stat.st_size, chunk_size, chunk_overlap, loader)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return [Document(page_content=content, metadata=metadata) for content, metadata in pickle.loads(row[0])]
+    
+    def put(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        chunk_size: int,
+        chunk_overlap: int,
+        loader: str,
+        chunks: List[Document]
+    ):
+        """Store the chunks of a file, replacing any previous entry."""
+        blob = pickle.dumps([(chunk.page_content, chunk.metadata) for chunk in chunks], pickle.HIGHEST_PROTOCOL)
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (str(path), stat.st_mtime, stat.st_size, chunk_size, chunk_overlap, loader, blob)
+                    )
+        except sqlite3.Error:
+            pass
+
 
 class PDFLoadError(Exception):
     """Custom exception for document loading errors."""
@@ -37,16 +451,19 @@ class FolderDocumentProcessor:
     Attributes:
         folder_path: Path to the folder containing document files
         module_id: Identifier for the module
-        chunk_size: Size of each text chunk
-        chunk_overlap: Overlap between consecutive chunks
+        chunk_size: Size of each text chunk, in tokens
+        chunk_overlap: Overlap between consecutive chunks, in tokens
+        workers: Number of processes used to load files in parallel
     """
     
     def __init__(
         self,
         folder_path: str,
         module_id: str,
-        chunk_size: int = ChunkingConfig.CHUNK_SIZE,
-        chunk_overlap: int = ChunkingConfig.CHUNK_OVERLAP
+        chunk_size: int = CHUNK_SIZE_TOKENS,
+        chunk_overlap: int = CHUNK_OVERLAP_TOKENS,
+        workers: Optional[int] = None,
+        fast_split: Optional[bool] = None
     ):
         """
         Initialize the folder document processor.
@@ -54,54 +471,107 @@ class FolderDocumentProcessor:
         Args:
             folder_path: Path to the folder containing PDF files
             module_id: Identifier for the module
-            chunk_size: Maximum size of each chunk
-            chunk_overlap: Number of characters to overlap between chunks
+            chunk_size: Maximum size of each chunk, in tokens
+            chunk_overlap: Number of tokens to overlap between chunks
+            workers: Number of loader processes (defaults to
+                LOAD_DOCUMENTS_NUMBER_OF_THREADS, else CPU count - 1)
+            fast_split: Use the experimental single-pass splitter (defaults
+                to DOCUMENT_FAST_SPLIT=1 in the environment)
         """
         self.folder_path = Path(folder_path)
         self.module_id = module_id
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self._text_splitter = self._create_text_splitter()
-    
-    def _create_text_splitter(self) -> RecursiveCharacterTextSplitter:
-        """Create and configure the text splitter."""
-        return RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ".", " ", ""]
-        )
+        if workers is None:
+            workers = get_load_workers()
+        self.workers = max(1, workers)
+        if fast_split is None:
+            fast_split = os.getenv("DOCUMENT_FAST_SPLIT") == "1"
+        self.fast_split = fast_split
+        self._text_splitter = _get_splitter(chunk_size, chunk_overlap)
+        self._chunk_cache = ChunkCache(self.folder_path / CHUNK_CACHE_FILE)
+        # (folder st_mtime_ns, files) from the last scan
+        self._cached_files: Optional[Tuple[int, List[Path]]] = None
     
     def ensure_folder_exists(self):
         """Create the folder if it doesn't exist."""
         self.folder_path.mkdir(parents=True, exist_ok=True)
     
+    def _scan_entries(self) -> List[os.DirEntry]:
+        """Scan the folder once for supported files, sorted case-insensitively by name."""
+        try:
+            with os.scandir(self.folder_path) as entries:
+                files = [
+                    (entry.name.lower(), entry) for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS and entry.is_file()
+                ]
+        except FileNotFoundError:
+            return []
+        files.sort(key=lambda item: item[0])
+        return [entry for _, entry in files]
+    
     def get_pdf_files(self) -> List[Path]:
-        """Get all supported document files in the folder (PDF, DOC, DOCX)."""
-        if not self.folder_path.exists():
+        """
+        Get all supported document files in the folder (PDF, DOC, DOCX).
+        
+        The list is reused until the folder's mtime changes, which happens
+        whenever a file is added, removed or renamed in it.
+        """
+        try:
+            mtime = self.folder_path.stat().st_mtime_ns
+        except FileNotFoundError:
             return []
-        files = []
-        for ext in SUPPORTED_EXTENSIONS:
-            files.extend(self.folder_path.glob(f"*{ext}"))
-        return sorted(files, key=lambda x: x.name.lower())
+        if self._cached_files is not None and self._cached_files[0] == mtime:
+            return list(self._cached_files[1])
+        
+        files = [Path(entry.path) for entry in self._scan_entries()]
+        self._cached_files = (mtime, files)
+        return list(files)
     
     def get_file_list(self) -> List[Dict[str, Any]]:
         """Get list of PDF files with metadata."""
         files = []
-        for pdf_path in self.get_pdf_files():
-            stat = pdf_path.stat()
+        for entry in self._scan_entries():
+            # DirEntry caches its stat result (filled by the scan itself on Windows)
+            stat = entry.stat()
             files.append({
-                "name": pdf_path.name,
-                "path": str(pdf_path),
+                "name": entry.name,
+                "path": entry.path,
                 "size": stat.st_size,
                 "modified": stat.st_mtime
             })
         return files
     
+    def _read_docx_with_python_docx(self, doc_path: Path) -> str:
+        """Extract Word text through python-docx (fallback for unusual packages)."""
+        try:
+            from docx import Document as DocxDocument
+        except ImportError:
+            raise DocumentLoadError(
+                "python-docx n'est pas installé. Exécutez: pip install python-docx"
+            )
+        
+        doc = DocxDocument(str(doc_path))
+        
+        # Extract text from paragraphs (each stripped once)
+        full_text = [text for text in (para.text.strip() for para in doc.paragraphs) if text]
+        
+        # Also extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = [text for text in (cell.text.strip() for cell in row.cells) if text]
+                if row_text:
+                    full_text.append(" | ".join(row_text))
+        
+        return "\n\n".join(full_text)
+    
     def _load_word_document(self, doc_path: Path) -> List[Document]:
         """
         Load a Word document (.doc or .docx).
         
+        Text is read straight from word/document.xml when possible; python-docx
+        is only used when lxml is unavailable or the package has no main part.
+        
         Args:
             doc_path: Path to the Word document
             
@@ -109,32 +579,9 @@ class FolderDocumentProcessor:
             List[Document]: List of document content
         """
         try:
-            from docx import Document as DocxDocument
-        except ImportError:
-            raise DocumentLoadError(
-                "python-docx n'est pas installé. Exécutez: pip install python-docx"
-            )
-        
-        try:
-            doc = DocxDocument(str(doc_path))
-            
-            # Extract text from paragraphs
-            full_text = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    full_text.append(para.text)
-            
-            # Also extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        full_text.append(" | ".join(row_text))
-            
-            content = "\n\n".join(full_text)
+            content = _read_docx_xml(doc_path) if etree is not None else None
+            if content is None:
+                content = self._read_docx_with_python_docx(doc_path)
             
             # Create single document (Word doesn't have pages like PDF)
             return [Document(
@@ -147,6 +594,8 @@ class FolderDocumentProcessor:
                 }
             )]
             
+        except DocumentLoadError:
+            raise
         except Exception as e:
             raise DocumentLoadError(
                 f"Erreur lors du chargement de '{doc_path.name}': {str(e)}"
@@ -165,21 +614,19 @@ class FolderDocumentProcessor:
         file_ext = pdf_path.suffix.lower()
         
         try:
-            if file_ext == '.pdf':
-                loader = PyPDFLoader(str(pdf_path))
-                documents = loader.load()
-            elif file_ext in ['.doc', '.docx']:
-                documents = self._load_word_document(pdf_path)
-            else:
+            loader = _LOADERS.get(file_ext)
+            if loader is None:
                 raise DocumentLoadError(
                     f"Format non supporté: {file_ext}. Formats supportés: PDF, DOC, DOCX"
                 )
+            documents = loader(pdf_path, self)
             
-            # Add file name to metadata
-            file_name = pdf_path.name
+            # Add file name to metadata (interned: shared by every page and chunk)
+            file_name = sys.intern(pdf_path.name)
+            module_id = sys.intern(self.module_id)
             for doc in documents:
                 doc.metadata["file_name"] = file_name
-                doc.metadata["module"] = self.module_id
+                doc.metadata["module"] = module_id
             
             return documents
             
@@ -190,6 +637,43 @@ class FolderDocumentProcessor:
                 f"Erreur lors du chargement de '{pdf_path.name}': {str(e)}"
             )
     
+    def _split_pages(self, documents: List[Document]) -> List[Document]:
+        """Split documents into chunks with the configured splitter (no labelling)."""
+        if self.fast_split:
+            chunker = _compile_chunker(self.chunk_size, self.chunk_overlap)
+            return [
+                Document(page_content=text, metadata=dict(doc.metadata))
+                for doc in documents
+                for text in chunker(doc.page_content)
+            ]
+        
+        # Pages already within chunk_size become one chunk as-is; only longer
+        # pages go through the recursive separator walk
+        token_counts = _get_encoding().encode_ordinary_batch([doc.page_content for doc in documents])
+        chunks = []
+        for doc, tokens in zip(documents, token_counts):
+            if len(tokens) <= self.chunk_size:
+                text = doc.page_content.strip()
+                if text:
+                    chunks.append(Document(page_content=text, metadata=dict(doc.metadata)))
+            else:
+                chunks.extend(self._text_splitter.split_documents([doc]))
+        return chunks
+    
+    def _label_chunks(self, chunks: List[Document], file_name: str) -> List[Document]:
+        """Number chunks within their file and set file/module metadata."""
+        # One shared string object per file/module instead of one per chunk
+        file_name = sys.intern(file_name)
+        module_id = sys.intern(self.module_id)
+        for i, chunk in enumerate(chunks):
+            chunk.metadata["chunk_id"] = i
+            chunk.metadata["file_name"] = file_name
+            chunk.metadata["module"] = module_id
+            if "source" in chunk.metadata:
+                chunk.metadata["source"] = sys.intern(chunk.metadata["source"])
+        
+        return chunks
+    
     def split_documents(self, documents: List[Document], file_name: str) -> List[Document]:
         """
         Split documents into smaller chunks with proper metadata.
@@ -201,72 +685,215 @@ class FolderDocumentProcessor:
         Returns:
             List[Document]: List of chunked documents
         """
-        chunks = self._text_splitter.split_documents(documents)
+        return self._label_chunks(self._split_pages(documents), file_name)
+    
+    def _load_and_split_pipelined(self, pdf_path: Path) -> List[Document]:
+        """
+        Load a PDF on a producer thread while this thread splits its pages.
         
-        for i, chunk in enumerate(chunks):
-            chunk.metadata["chunk_id"] = i
-            chunk.metadata["file_name"] = file_name
-            chunk.metadata["module"] = self.module_id
+        PDFium text extraction and tiktoken both release the GIL, so the
+        next pages are extracted while the current one is being split.
+        The bounded queue keeps at most PAGE_QUEUE_SIZE pages in flight.
+        """
+        pages: queue.Queue = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+        stats = {"skipped_pages": 0}
+        stop = threading.Event()
+        failure: List[Exception] = []
         
-        return chunks
+        def put(item: Optional[Document]) -> bool:
+            # Give up once the consumer has stopped, instead of blocking on a full queue
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def produce():
+            try:
+                for page in _iter_pdf_pages_pdfium(pdf_path, stats):
+                    if not put(page):
+                        return
+            except Exception as e:
+                failure.append(e)
+            finally:
+                put(None)
+        
+        producer = threading.Thread(target=produce, name="pdf-page-loader", daemon=True)
+        producer.start()
+        
+        chunks = []
+        try:
+            while (page := pages.get()) is not None:
+                chunks.extend(self._split_pages([page]))
+        finally:
+            stop.set()
+            producer.join()
+        
+        if failure:
+            raise DocumentLoadError(
+                f"Erreur lors du chargement de '{pdf_path.name}': {str(failure[0])}"
+            )
+        
+        for chunk in chunks:
+            chunk.metadata["skipped_pages"] = stats["skipped_pages"]
+        return self._label_chunks(chunks, pdf_path.name)
+    
+    def _load_and_split(self, pdf_path: Path) -> List[Document]:
+        """Load and chunk a file, pipelining page extraction with splitting for PDFs."""
+        if pdfium is not None and pdf_path.suffix.lower() == ".pdf":
+            return self._load_and_split_pipelined(pdf_path)
+        return self.split_documents(self.load_single_pdf(pdf_path), pdf_path.name)
+    
+    def _cache_loader_key(self) -> str:
+        """Identify the code producing the chunks: loader version, PDF backend and splitter mode."""
+        backend = "pdfium" if pdfium is not None else "pypdf"
+        splitter = "fast" if self.fast_split else "default"
+        return f"{LOADER_VERSION}:{backend}:{splitter}"
     
     def process_single_file(self, pdf_path: Path) -> List[Document]:
         """
         Load and process a single PDF file.
         
+        Unchanged files are served from the chunk cache without parsing.
+        The splitter mode is part of the cache key, so the experimental
+        fast splitter's output never mixes with the default splitter's.
+        
         Args:
             pdf_path: Path to the PDF file
             
         Returns:
             List[Document]: Chunked documents from the file
         """
-        documents = self.load_single_pdf(pdf_path)
-        return self.split_documents(documents, pdf_path.name)
+        stat = pdf_path.stat()
+        loader = self._cache_loader_key()
+        chunks = self._chunk_cache.get(pdf_path, stat, self.chunk_size, self.chunk_overlap, loader)
+        if chunks is not None:
+            return chunks
+        
+        chunks = self._load_and_split(pdf_path)
+        self._chunk_cache.put(pdf_path, stat, self.chunk_size, self.chunk_overlap, loader, chunks)
+        return chunks
     
-    def process_all_files(self) -> Generator[Dict[str, Any], None, None]:
+    def process_all_files(self, files: Optional[List[Path]] = None) -> Generator[Dict[str, Any], None, None]:
         """
         Process all PDF files in the folder.
         
+        Args:
+            files: Optional subset of files to process (defaults to all)
+        
         Yields:
             Dict with file info and processed chunks
         """
-        pdf_files = self.get_pdf_files()
+        pdf_files = self.get_pdf_files() if files is None else files
+        _prefetch_files(pdf_files)
         
-        for pdf_path in pdf_files:
-            try:
-                chunks = self.process_single_file(pdf_path)
-                yield {
-                    "file_name": pdf_path.name,
-                    "file_path": str(pdf_path),
-                    "chunks": chunks,
-                    "chunk_count": len(chunks),
-                    "success": True,
-                    "error": None
-                }
-            except PDFLoadError as e:
-                yield {
-                    "file_name": pdf_path.name,
-                    "file_path": str(pdf_path),
-                    "chunks": [],
-                    "chunk_count": 0,
-                    "success": False,
-                    "error": str(e)
-                }
+        if self.workers < 2 or len(pdf_files) < 2:
+            for pdf_path in pdf_files:
+                yield self._process_file_result(pdf_path)
+            return
+        
+        # Each worker builds a single-process processor: files are the unit of parallelism
+        tasks = [
+            (str(self.folder_path), self.module_id, self.chunk_size, self.chunk_overlap, self.fast_split, pdf_path)
+            for pdf_path in pdf_files
+        ]
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(pdf_files)),
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=LOAD_WORKER_MAX_TASKS
+        ) as executor:
+            futures = [executor.submit(_process_file_worker, task) for task in tasks]
+            for pdf_path, future in zip(pdf_files, futures):
+                # Errors outside the worker's own handling (result pickling,
+                # a crashed worker) fail this file only
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield self._failed_result(pdf_path, e)
     
-    def load_all_documents(self) -> List[Document]:
+    def _process_file_result(self, pdf_path: Path) -> Dict[str, Any]:
         """
-        Load and chunk all PDF files in the folder.
+        Process one file into a result dict, capturing errors instead of raising.
         
-        Returns:
-            List[Document]: All chunked documents from all files
+        Any failure (unreadable file, parser error, ...) becomes a failed
+        result, so one bad file never aborts the pool or the sync.
         """
-        all_chunks = []
+        try:
+            chunks = self.process_single_file(pdf_path)
+            return {
+                "file_name": pdf_path.name,
+                "file_path": str(pdf_path),
+                "chunks": chunks,
+                "chunk_count": len(chunks),
+                "success": True,
+                "error": None
+            }
+        except Exception as e:
+            return self._failed_result(pdf_path, e)
+    
+    @staticmethod
+    def _failed_result(pdf_path: Path, error: Exception) -> Dict[str, Any]:
+        """Result dict of a file that could not be processed."""
+        return {
+            "file_name": pdf_path.name,
+            "file_path": str(pdf_path),
+            "chunks": [],
+            "chunk_count": 0,
+            "success": False,
+            "error": str(error)
+        }
+    
+    def iter_all_documents(self) -> Iterator[Document]:
+        """
+        Lazily load and chunk all PDF files in the folder.
+        
+        Only one file's chunks are held at a time, so callers that consume
+        incrementally (e.g. embedding in batches) keep memory bounded.
         
+        Yields:
+            Document: Chunked documents, file by file
+        """
         for result in self.process_all_files():
             if result["success"]:
-                all_chunks.extend(result["chunks"])
+                yield from result["chunks"]
+    
+    def load_all_documents(self) -> List[Document]:
+        """
+        Load and chunk all PDF files in the folder.
         
-        return all_chunks
+        Returns:
+            List[Document]: All chunked documents from all files
+        """
+        return list(self.iter_all_documents())
+
+
+def _load_pdf_file(pdf_path: Path, processor: FolderDocumentProcessor) -> List[Document]:
+    """Loader for .pdf files."""
+    return load_pdf_pages(pdf_path, max_workers=processor.workers)
+
+
+def _load_word_file(doc_path: Path, processor: FolderDocumentProcessor) -> List[Document]:
+    """Loader for .doc and .docx files."""
+    return processor._load_word_document(doc_path)
+
+
+# File extension -> loader; register new formats here (and in SUPPORTED_EXTENSIONS)
+_LOADERS: Dict[str, Callable[[Path, FolderDocumentProcessor], List[Document]]] = {
+    '.pdf': _load_pdf_file,
+    '.doc': _load_word_file,
+    '.docx': _load_word_file,
+}
+
+
+def _process_file_worker(task: Tuple[str, str, int, int, bool, Path]) -> Dict[str, Any]:
+    """Load and chunk one file in a worker process (top-level so it can be pickled)."""
+    folder_path, module_id, chunk_size, chunk_overlap, fast_split, pdf_path = task
+    processor = FolderDocumentProcessor(
+        folder_path, module_id, chunk_size, chunk_overlap, workers=1, fast_split=fast_split
+    )
+    return processor._process_file_result(pdf_path)
 
 
 # Keep backward compatibility with single file processor
@@ -278,14 +905,17 @@ class DocumentProcessor(FolderDocumentProcessor):
     def __init__(
         self,
         pdf_path: str,
-        chunk_size: int = ChunkingConfig.CHUNK_SIZE,
-        chunk_overlap: int = ChunkingConfig.CHUNK_OVERLAP
+        chunk_size: int = CHUNK_SIZE_TOKENS,
+        chunk_overlap: int = CHUNK_OVERLAP_TOKENS
     ):
         self.pdf_path = Path(pdf_path)
         self.module_id = "default"
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self._text_splitter = self._create_text_splitter()
+        self.workers = 1
+        self.fast_split = False
+        self._text_splitter = _get_splitter(chunk_size, chunk_overlap)
+        self._chunk_cache = ChunkCache(self.pdf_path.parent / CHUNK_CACHE_FILE)
     
     def validate_pdf_exists(self) -> bool:
         """Check if the PDF file exists."""
@@ -300,19 +930,21 @@ class DocumentProcessor(FolderDocumentProcessor):
         return self.process_single_file(self.pdf_path)
 
 
-def create_folder_processor(module_config: Dict[str, Any]) -> FolderDocumentProcessor:
+def create_folder_processor(module_config: Dict[str, Any], workers: Optional[int] = None) -> FolderDocumentProcessor:
     """
     Factory function to create a FolderDocumentProcessor for a specific module.
     
     Args:
         module_config: Module configuration dictionary
+        workers: Number of loader processes (defaults to get_load_workers())
         
     Returns:
         FolderDocumentProcessor: Configured processor instance
     """
     return FolderDocumentProcessor(
         folder_path=module_config["documents_folder"],
-        module_id=module_config["id"]
+        module_id=module_config["id"],
+        workers=workers
     )
 
 
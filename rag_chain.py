@@ -3,17 +3,36 @@ RAG Chain module for question-answering logic.
 Handles the retrieval-augmented generation pipeline for any module.
 """
 
+import asyncio
 import re
-from typing import Dict, Any, List, Optional
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
-from langchain_core.runnables import RunnablePassthrough, RunnableLambda
+from langchain_core.runnables import RunnableGenerator, RunnableLambda, RunnableParallel, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 
-from config import ModelConfig, get_openai_api_key
-from vector_store import VectorStoreManager
+from config import LLM_MODEL, LLM_TEMPERATURE, get_openai_api_key, get_openai_http_client
+from semantic_cache import SemanticCache
+from vector_store import VectorStoreManager, _run_async
+
+# langchain_openai is imported when the first LLM is created
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+@lru_cache(maxsize=64)
+def _prompt_from_template(template: str) -> ChatPromptTemplate:
+    """
+    Parse a prompt template once per distinct template string.
+    
+    The system prompts are per module and fixed, so every chain built for a
+    module (and every rewriter/summarizer) reuses one parsed template.
+    """
+    return ChatPromptTemplate.from_template(template)
 
 
 # =============================================================================
@@ -48,14 +67,17 @@ Question reformulée (une seule phrase, sans explication):"""
         self._llm = None
         self._chain = None
     
-    def _get_llm(self) -> ChatOpenAI:
+    def _get_llm(self) -> "ChatOpenAI":
         """Get a fast LLM for query rewriting."""
         if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            
             api_key = get_openai_api_key()
             self._llm = ChatOpenAI(
                 model="gpt-4o-mini",
                 temperature=0,
                 openai_api_key=api_key,
+                http_client=get_openai_http_client(),
                 max_tokens=150  # Keep it short
             )
         return self._llm
@@ -63,7 +85,7 @@ Question reformulée (une seule phrase, sans explication):"""
     def _get_chain(self):
         """Build the rewriting chain."""
         if self._chain is None:
-            prompt = ChatPromptTemplate.from_template(self.REWRITE_PROMPT)
+            prompt = _prompt_from_template(self.REWRITE_PROMPT)
             self._chain = prompt | self._get_llm() | StrOutputParser()
         return self._chain
     
@@ -91,45 +113,207 @@ Question reformulée (une seule phrase, sans explication):"""
             return question
 
 
+# =============================================================================
+# Conversation Summarizer - Résume les anciens échanges d'une longue conversation
+# =============================================================================
+
+class ConversationSummarizer:
+    """
+    Résume les échanges les plus anciens d'une conversation.
+    
+    Les derniers échanges restent transmis tels quels au LLM; les plus anciens
+    sont condensés en un court résumé, mis à jour fenêtre par fenêtre (résumé
+    précédent + une nouvelle fenêtre), ce qui borne à la fois le prompt de la
+    réponse et celui du résumé quelle que soit la longueur de la conversation.
+    """
+    
+    SUMMARY_PROMPT = """Tu tiens à jour le résumé d'une conversation entre un utilisateur et un assistant juridique marocain.
+Intègre le nouvel échange au résumé précédent, de manière concise.
+Conserve les faits, les situations personnelles, les articles et les chiffres mentionnés, utiles pour comprendre les questions suivantes.
+
+Résumé précédent:
+{summary}
+
+Nouvel échange:
+{conversation}
+
+Résumé mis à jour (quelques phrases, sans introduction):"""
+
+    def __init__(self, cache_size: int = 128):
+        """Initialize the summarizer with a cache of computed summaries."""
+        self._llm = None
+        self._chain = None
+        # (previous summary, window) -> updated summary
+        self._cache: "OrderedDict[Tuple[str, Tuple[Tuple[str, str], ...]], str]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+    
+    def _get_chain(self):
+        """Build the summarization chain with a fast LLM."""
+        if self._chain is None:
+            from langchain_openai import ChatOpenAI
+            
+            api_key = get_openai_api_key()
+            self._llm = ChatOpenAI(
+                model="gpt-4o-mini",
+                temperature=0,
+                openai_api_key=api_key,
+                http_client=get_openai_http_client(),
+                max_tokens=400
+            )
+            prompt = _prompt_from_template(self.SUMMARY_PROMPT)
+            self._chain = prompt | self._llm | StrOutputParser()
+        return self._chain
+    
+    @staticmethod
+    def _windows(messages: List[Dict[str, str]], window_size: int) -> List[Tuple[Tuple[str, str], ...]]:
+        """Split messages into (role, content) windows of window_size, oldest first."""
+        pairs = [
+            ("Utilisateur" if msg["role"] == "user" else "Assistant", msg["content"])
+            for msg in messages
+        ]
+        return [tuple(pairs[i:i + window_size]) for i in range(0, len(pairs), window_size)]
+    
+    @staticmethod
+    def _inputs(summary: str, window: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+        """Prompt variables folding one window into the previous summary."""
+        return {
+            "summary": summary or "(aucun)",
+            "conversation": "\n".join(f"{role}: {content}" for role, content in window)
+        }
+    
+    def _cache_get(self, key: Tuple[str, Tuple[Tuple[str, str], ...]]) -> Optional[str]:
+        """Look up a folded summary, marking it as recently used."""
+        with self._lock:
+            summary = self._cache.get(key)
+            if summary is not None:
+                self._cache.move_to_end(key)
+            return summary
+    
+    def _cache_put(self, key: Tuple[str, Tuple[Tuple[str, str], ...]], summary: str):
+        """Store a folded summary, evicting the least recently used one."""
+        with self._lock:
+            self._cache[key] = summary
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+    
+    def summarize(self, messages: List[Dict[str, str]], window_size: int) -> str:
+        """
+        Summarize a segment of conversation history.
+        
+        Windows are folded oldest first and each fold is cached, so a
+        conversation that grew by one turn only pays for its last window.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            window_size: Number of messages folded into the summary per call
+            
+        Returns:
+            Summary text; if summarization fails, the summary of the windows
+            folded so far (empty if none)
+        """
+        summary = ""
+        for window in self._windows(messages, window_size):
+            key = (summary, window)
+            folded = self._cache_get(key)
+            if folded is None:
+                try:
+                    folded = self._get_chain().invoke(self._inputs(summary, window)).strip()
+                except Exception:
+                    return summary
+                self._cache_put(key, folded)
+            summary = folded
+        return summary
+    
+    async def asummarize(self, messages: List[Dict[str, str]], window_size: int) -> str:
+        """Async version of summarize(), for callers running an event loop."""
+        summary = ""
+        for window in self._windows(messages, window_size):
+            key = (summary, window)
+            folded = self._cache_get(key)
+            if folded is None:
+                try:
+                    folded = (await self._get_chain().ainvoke(self._inputs(summary, window))).strip()
+                except Exception:
+                    return summary
+                self._cache_put(key, folded)
+            summary = folded
+        return summary
+
+
 # =============================================================================
 # Conversational Query Detection
 # =============================================================================
 
-# Patterns for conversational queries (non-legal)
-CONVERSATIONAL_PATTERNS = [
-    r"^(salut|bonjour|bonsoir|hello|hi|hey|coucou)",
-    r"^(ça va|comment vas|comment tu vas|tu vas bien|comment allez)",
-    r"^(merci|thanks|thank you)",
-    r"^(au revoir|bye|à bientôt|à plus)",
-    r"^(qui es[ -]tu|tu es qui|c'est quoi|présente[ -]toi)",
-    r"^(ok|d'accord|compris|super|parfait|génial|cool)$",
-    r"^(oui|non|ouais|nope)$",
+# Conversational queries (non-legal) are all literal: greeting-style openings
+# matched as prefixes, and one-word replies matched exactly
+CONVERSATIONAL_PREFIXES = (
+    "salut", "bonjour", "bonsoir", "hello", "hi", "hey", "coucou",
+    "ça va", "comment vas", "comment tu vas", "tu vas bien", "comment allez",
+    "merci", "thanks", "thank you",
+    "au revoir", "bye", "à bientôt", "à plus",
+    "qui es-tu", "qui es tu", "tu es qui", "c'est quoi", "présente-toi", "présente toi",
+)
+CONVERSATIONAL_REPLIES = frozenset({
+    "ok", "d'accord", "compris", "super", "parfait", "génial", "cool",
+    "oui", "non", "ouais", "nope",
+})
+
+# Keywords marking a short query as legal rather than small talk
+LEGAL_KEYWORDS = [
+    "impôt", "taxe", "tva", "is", "ir", "fiscal", "taux", "article",
+    "cgi", "déclar", "exonér", "société", "revenu", "bénéfice",
+    "auto-entrepreneur", "travail", "contrat", "licenciement", "congé",
+    "salaire", "employeur", "salarié", "cdd", "cdi", "préavis",
+    "indemnité", "syndicat", "grève", "heures", "smig"
 ]
 
+# Substring match on any keyword in a single scan
+_LEGAL_KEYWORDS_RE = re.compile("|".join(re.escape(kw) for kw in LEGAL_KEYWORDS))
 
+
+@lru_cache(maxsize=4096)
 def is_conversational_query(question: str) -> bool:
-    """Check if the question is a conversational query."""
+    """Check if the question is a conversational query (memoized: called several times per question)."""
     question_lower = question.lower().strip()
     
-    for pattern in CONVERSATIONAL_PATTERNS:
-        if re.search(pattern, question_lower, re.IGNORECASE):
-            return True
+    if question_lower in CONVERSATIONAL_REPLIES or question_lower.startswith(CONVERSATIONAL_PREFIXES):
+        return True
     
     # Check for short non-legal queries
-    legal_keywords = [
-        "impôt", "taxe", "tva", "is", "ir", "fiscal", "taux", "article",
-        "cgi", "déclar", "exonér", "société", "revenu", "bénéfice",
-        "auto-entrepreneur", "travail", "contrat", "licenciement", "congé",
-        "salaire", "employeur", "salarié", "cdd", "cdi", "préavis",
-        "indemnité", "syndicat", "grève", "heures", "smig"
-    ]
-    
-    if len(question_lower) < 15 and not any(kw in question_lower for kw in legal_keywords):
+    if len(question_lower) < 15 and not _LEGAL_KEYWORDS_RE.search(question_lower):
         return True
     
     return False
 
 
+def _source_pages(documents: List[Document]) -> List[int]:
+    """Collect the distinct page numbers of retrieved documents in one pass, sorted."""
+    seen = set()
+    for doc in documents:
+        page = doc.metadata.get("page")
+        if isinstance(page, int):
+            seen.add(page)
+        elif isinstance(page, str) and page.isdigit():
+            seen.add(int(page))
+    return sorted(seen)
+
+
+def _answer_tokens(chunks: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Pick the answer tokens out of the streamed output of the chain with sources."""
+    for chunk in chunks:
+        if "answer" in chunk:
+            yield chunk["answer"]
+
+
+async def _aanswer_tokens(chunks: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Async version of _answer_tokens."""
+    async for chunk in chunks:
+        if "answer" in chunk:
+            yield chunk["answer"]
+
+
 class RAGChainBuilder:
     """
     Builds and manages the RAG chain for any legal module.
@@ -141,8 +325,8 @@ class RAGChainBuilder:
         vector_store_manager: VectorStoreManager,
         system_prompt: str,
         module_name: str,
-        model_name: str = ModelConfig.LLM_MODEL,
-        temperature: float = ModelConfig.LLM_TEMPERATURE
+        model_name: str = LLM_MODEL,
+        temperature: float = LLM_TEMPERATURE
     ):
         """
         Initialize the RAG chain builder.
@@ -161,24 +345,28 @@ class RAGChainBuilder:
         self.temperature = temperature
         self._llm = None
         self._chain = None
+        self._chain_with_sources = None
         self._conversational_chain = None
         # Query rewriter for better retrieval
         self._query_rewriter = QueryRewriter(module_name)
     
-    def _get_llm(self) -> ChatOpenAI:
+    def _get_llm(self) -> "ChatOpenAI":
         """Get or create the LLM instance."""
         if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            
             api_key = get_openai_api_key()
             self._llm = ChatOpenAI(
                 model=self.model_name,
                 temperature=self.temperature,
-                openai_api_key=api_key
+                openai_api_key=api_key,
+                http_client=get_openai_http_client()
             )
         return self._llm
     
     def _create_prompt_template(self) -> ChatPromptTemplate:
         """Create the prompt template for the RAG chain."""
-        return ChatPromptTemplate.from_template(self.system_prompt)
+        return _prompt_from_template(self.system_prompt)
     
     def _create_conversational_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template for conversational responses."""
@@ -191,44 +379,86 @@ Réponds de manière chaleureuse et naturelle en français. Si c'est une premiè
 Message de l'utilisateur : {{question}}
 
 Ta réponse chaleureuse :"""
-        return ChatPromptTemplate.from_template(conversational_template)
+        return _prompt_from_template(conversational_template)
     
     def _format_documents(self, documents: List[Document]) -> str:
-        """Format retrieved documents into a single context string with file citations."""
+        """
+        Format retrieved documents into a single context string with file citations.
+        
+        Documents are ordered by (file, page, chunk) rather than retrieval
+        rank and labelled only by file and page, so the same chunks always
+        produce the same prompt text. That keeps the prompt prefix reusable
+        by provider-side prompt caching across turns; the cost is that the
+        LLM no longer sees which passage ranked first.
+        """
         if not documents:
             return "Aucun contexte disponible."
         
-        formatted_parts = []
-        for i, doc in enumerate(documents, 1):
-            file_name = doc.metadata.get("file_name", "Document")
-            page_num = doc.metadata.get("page", "N/A")
-            content = doc.page_content.strip()
-            formatted_parts.append(f"[Source {i} - Fichier: {file_name}, Page {page_num}]\n{content}")
-        
-        return "\n\n---\n\n".join(formatted_parts)
+        ordered = sorted(
+            documents,
+            key=lambda doc: (
+                doc.metadata.get("file_name", ""),
+                doc.metadata.get("page", 0),
+                doc.metadata.get("chunk_id", 0)
+            )
+        )
+        return "\n\n---\n\n".join(
+            f"[Fichier: {doc.metadata.get('file_name', 'Document')}, "
+            f"Page {doc.metadata.get('page', 'N/A')}]\n{doc.page_content.strip()}"
+            for doc in ordered
+        )
     
     def rewrite_query(self, question: str) -> str:
         """Rewrite a query for better retrieval."""
         return self._query_rewriter.rewrite(question)
     
+    def _create_retriever(self):
+        """Create the MMR retriever used by the RAG chains."""
+        return self.vector_store_manager.get_retriever(
+            search_type="mmr",
+            search_kwargs={"k": 8, "fetch_k": 24, "lambda_mult": 0.5}
+        )
+    
     def build_chain(self):
-        """Build the complete RAG chain with query rewriting."""
-        retriever = self.vector_store_manager.get_retriever(search_kwargs={"k": 15})
+        """
+        Build the complete RAG chain with query rewriting.
+        
+        This is the answer-only view of the chain with sources: the same
+        runnables, with the answer tokens picked out of its streamed output.
+        """
+        self._chain = self.get_chain_with_sources() | RunnableGenerator(_answer_tokens, _aanswer_tokens)
+        return self._chain
+    
+    def build_chain_with_sources(self):
+        """
+        Build the RAG chain returning the answer together with its documents.
+        
+        Retrieval runs once: the same documents fill the prompt context and
+        are returned under "docs", so sources need no second search.
+        Output: {"question": ..., "docs": [...], "answer": ...}
+        """
+        retriever = self._create_retriever()
         prompt = self._create_prompt_template()
         llm = self._get_llm()
         
-        # Chain that rewrites query, retrieves docs, and generates response
-        self._chain = (
+        answer_chain = (
             {
-                "context": RunnableLambda(self.rewrite_query) | retriever | self._format_documents,
-                "question": RunnablePassthrough()
+                "context": RunnableLambda(lambda x: self._format_documents(x["docs"])),
+                "question": RunnableLambda(lambda x: x["question"])
             }
             | prompt
             | llm
             | StrOutputParser()
         )
+        self._chain_with_sources = (
+            RunnableParallel(
+                docs=RunnableLambda(self.rewrite_query) | retriever,
+                question=RunnablePassthrough()
+            )
+            | RunnablePassthrough.assign(answer=answer_chain)
+        )
         
-        return self._chain
+        return self._chain_with_sources
     
     def _build_conversational_chain(self):
         """Build the conversational chain for non-legal queries."""
@@ -250,6 +480,12 @@ Ta réponse chaleureuse :"""
             self.build_chain()
         return self._chain
     
+    def get_chain_with_sources(self):
+        """Get the RAG chain returning answer and documents, building it if necessary."""
+        if self._chain_with_sources is None:
+            self.build_chain_with_sources()
+        return self._chain_with_sources
+    
     def get_conversational_chain(self):
         """Get the conversational chain, building it if necessary."""
         if self._conversational_chain is None:
@@ -285,18 +521,65 @@ Ta réponse chaleureuse :"""
 class RAGQueryHandler:
     """High-level handler for RAG queries."""
     
-    def __init__(self, rag_chain: RAGChainBuilder, module_id: str = "cgi"):
-        """Initialize the query handler."""
+    def __init__(
+        self,
+        rag_chain: RAGChainBuilder,
+        module_id: str = "cgi",
+        answer_cache: Optional[SemanticCache] = None
+    ):
+        """
+        Initialize the query handler.
+        
+        Args:
+            rag_chain: RAG chain builder for the module
+            module_id: Identifier for the module
+            answer_cache: Semantic cache of standalone answers (a new one by default)
+        """
         self.rag_chain = rag_chain
         self.module_id = module_id
+        self.answer_cache = answer_cache if answer_cache is not None else SemanticCache()
+        # Vector store data_version the answer cache was filled against
+        self._answer_cache_version: Optional[int] = None
+        self._summarizer = ConversationSummarizer()
+    
+    @staticmethod
+    def _split_history(
+        history: List[Dict[str, str]],
+        max_messages: int
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """Split history, minus the initial greeting, into (older messages, last max_messages)."""
+        # Skip the initial assistant greeting
+        relevant_history = history[1:]
+        if len(relevant_history) <= max_messages:
+            return [], relevant_history
+        return relevant_history[:-max_messages], relevant_history[-max_messages:]
+    
+    @staticmethod
+    def _render_history(summary: str, recent: List[Dict[str, str]]) -> str:
+        """Render the summary of older messages followed by the recent ones verbatim."""
+        formatted_parts = []
+        if summary:
+            formatted_parts.append(f"Résumé des échanges précédents: {summary}")
+        
+        for msg in recent:
+            role = "Utilisateur" if msg["role"] == "user" else "Assistant"
+            # Truncate long messages for context
+            content = msg["content"][:500] + "..." if len(msg["content"]) > 500 else msg["content"]
+            formatted_parts.append(f"{role}: {content}")
+        
+        return "\n".join(formatted_parts)
     
     def _format_conversation_history(self, history: List[Dict[str, str]], max_exchanges: int = 5) -> str:
         """
-        Format the last N exchanges from conversation history.
+        Format conversation history: recent exchanges verbatim, older ones summarized.
+        
+        The last max_exchanges exchanges are kept verbatim. Older messages
+        are folded into a running summary one window of max_exchanges
+        exchanges at a time, so each summarization call sees one window.
         
         Args:
             history: List of message dictionaries with 'role' and 'content' keys
-            max_exchanges: Maximum number of exchanges (user+assistant pairs) to include
+            max_exchanges: Number of exchanges (user+assistant pairs) kept verbatim
             
         Returns:
             Formatted conversation history string
@@ -304,74 +587,158 @@ class RAGQueryHandler:
         if not history or len(history) <= 1:
             return ""
         
-        # Skip the initial assistant greeting, take last messages
         # Each exchange = 2 messages (user + assistant)
-        relevant_history = history[1:]  # Skip first greeting
         max_messages = max_exchanges * 2
-        
-        if len(relevant_history) > max_messages:
-            relevant_history = relevant_history[-max_messages:]
-        
-        if not relevant_history:
+        older, recent = self._split_history(history, max_messages)
+        summary = self._summarizer.summarize(older, max_messages) if older else ""
+        return self._render_history(summary, recent)
+    
+    async def _aformat_conversation_history(self, history: List[Dict[str, str]], max_exchanges: int = 5) -> str:
+        """Async version of _format_conversation_history()."""
+        if not history or len(history) <= 1:
             return ""
         
-        formatted_parts = []
-        for msg in relevant_history:
-            role = "Utilisateur" if msg["role"] == "user" else "Assistant"
-            # Truncate long messages for context
-            content = msg["content"][:500] + "..." if len(msg["content"]) > 500 else msg["content"]
-            formatted_parts.append(f"{role}: {content}")
+        max_messages = max_exchanges * 2
+        older, recent = self._split_history(history, max_messages)
+        summary = await self._summarizer.asummarize(older, max_messages) if older else ""
+        return self._render_history(summary, recent)
+    
+    @staticmethod
+    def _with_history(question: str, history_text: str) -> str:
+        """Prefix the question with formatted conversation history, if any."""
+        if history_text:
+            return f"Contexte de conversation:\n{history_text}\n\nQuestion actuelle: {question}"
+        return question
+    
+    def _question_with_context(self, question: str, conversation_history: Optional[List[Dict[str, str]]]) -> str:
+        """Prefix the question with the formatted conversation history, if any."""
+        if conversation_history and len(conversation_history) > 1:
+            return self._with_history(question, self._format_conversation_history(conversation_history))
+        return question
+    
+    async def _aquestion_with_context(
+        self,
+        question: str,
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> str:
+        """Async version of _question_with_context()."""
+        if conversation_history and len(conversation_history) > 1:
+            return self._with_history(question, await self._aformat_conversation_history(conversation_history))
+        return question
+    
+    @staticmethod
+    def _response(answer: str, documents: List[Document], is_conversational: bool) -> Dict[str, Any]:
+        """Build the structured response of a successful query."""
+        return {
+            "answer": answer,
+            "sources": _source_pages(documents),
+            "success": True,
+            "error": None,
+            "is_conversational": is_conversational
+        }
+    
+    @staticmethod
+    def _error_response(error: Exception) -> Dict[str, Any]:
+        """Build the structured response of a failed query."""
+        return {
+            "answer": None,
+            "sources": [],
+            "success": False,
+            "error": str(error),
+            "is_conversational": False
+        }
+    
+    def _answers(self) -> SemanticCache:
+        """
+        The answer cache, first cleared if the collection was written since it was filled.
         
-        return "\n".join(formatted_parts)
+        Writes through this module's vector store manager invalidate it at
+        once; resyncs from another process are covered by the cache TTL.
+        """
+        version = self.rag_chain.vector_store_manager.data_version
+        if version != self._answer_cache_version:
+            if self._answer_cache_version is not None:
+                self.answer_cache.clear()
+            self._answer_cache_version = version
+        return self.answer_cache
+    
+    @staticmethod
+    def _is_standalone(conversation_history: Optional[List[Dict[str, str]]]) -> bool:
+        """Whether the answer can be cached: it doesn't depend on earlier messages."""
+        return not conversation_history or len(conversation_history) <= 1
     
     def ask(self, question: str, conversation_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
         """
         Ask a question and get a structured response.
         
+        Legal questions go through one chain run that returns the answer and
+        the documents it was built from; sources come from those documents.
+        Standalone legal questions are first looked up in the semantic
+        answer cache, so paraphrases of an answered question skip retrieval
+        and generation.
+        
         Args:
             question: The user's question
             conversation_history: Optional list of previous messages for context
         """
         try:
             is_conversational = is_conversational_query(question)
+            question_with_context = self._question_with_context(question, conversation_history)
             
-            # Build question with conversation context
-            if conversation_history and len(conversation_history) > 1:
-                history_text = self._format_conversation_history(conversation_history)
-                if history_text:
-                    question_with_context = f"Contexte de conversation:\n{history_text}\n\nQuestion actuelle: {question}"
-                else:
-                    question_with_context = question
-            else:
-                question_with_context = question
+            if is_conversational:
+                answer = self.rag_chain.invoke(question_with_context)
+                return self._response(answer, [], True)
+            
+            query_vector = None
+            if self._is_standalone(conversation_history):
+                # Keyed on the raw question: keying on the rewritten query
+                # would cost an LLM rewrite on every hit; a miss pays one
+                # extra (LRU-cached) query embedding instead
+                query_vector = self.rag_chain.vector_store_manager.embed_query(question)
+                cached = self._answers().get(query_vector)
+                if cached is not None:
+                    return dict(cached)
             
-            answer = self.rag_chain.invoke(question_with_context)
+            result = self.rag_chain.get_chain_with_sources().invoke(question_with_context)
+            response = self._response(result["answer"], result["docs"], False)
+            if query_vector is not None:
+                self._answers().put(query_vector, response)
+            return dict(response)
+            
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def aask(self, question: str, conversation_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Async version of ask(), for callers running an event loop."""
+        try:
+            is_conversational = is_conversational_query(question)
+            question_with_context = await self._aquestion_with_context(question, conversation_history)
             
             if is_conversational:
-                source_pages = []
-            else:
-                sources = self.rag_chain.get_relevant_documents(question)
-                source_pages = list(set(
-                    doc.metadata.get("page", "N/A") 
-                    for doc in sources
-                ))
+                if is_conversational_query(question_with_context):
+                    chain = self.rag_chain.get_conversational_chain()
+                else:
+                    chain = self.rag_chain.get_chain()
+                answer = await chain.ainvoke(question_with_context)
+                return self._response(answer, [], True)
             
-            return {
-                "answer": answer,
-                "sources": source_pages,
-                "success": True,
-                "error": None,
-                "is_conversational": is_conversational
-            }
+            query_vector = None
+            if self._is_standalone(conversation_history):
+                query_vector = await asyncio.to_thread(
+                    self.rag_chain.vector_store_manager.embed_query, question
+                )
+                cached = self._answers().get(query_vector)
+                if cached is not None:
+                    return dict(cached)
+            
+            result = await self.rag_chain.get_chain_with_sources().ainvoke(question_with_context)
+            response = self._response(result["answer"], result["docs"], False)
+            if query_vector is not None:
+                self._answers().put(query_vector, response)
+            return dict(response)
             
         except Exception as e:
-            return {
-                "answer": None,
-                "sources": [],
-                "success": False,
-                "error": str(e),
-                "is_conversational": False
-            }
+            return self._error_response(e)
     
     def stream(self, question: str, conversation_history: List[Dict[str, str]] = None):
         """
@@ -388,25 +755,82 @@ class RAGQueryHandler:
                 yield chunk
         else:
             # For legal queries, build question with conversation context
-            if conversation_history and len(conversation_history) > 1:
-                history_text = self._format_conversation_history(conversation_history)
-                if history_text:
-                    question_with_context = f"Contexte de conversation:\n{history_text}\n\nQuestion actuelle: {question}"
-                else:
-                    question_with_context = question
-            else:
-                question_with_context = question
+            question_with_context = self._question_with_context(question, conversation_history)
             
             # Stream the RAG response
             for chunk in self.rag_chain.get_chain().stream(question_with_context):
                 yield chunk
     
+    async def aask_batch(self, questions: List[str], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Answer many standalone questions concurrently (e.g. an evaluation set).
+        
+        Questions are answered independently, with at most max_concurrency
+        chains in flight; nothing is batched across questions.
+        
+        Args:
+            questions: Questions to answer, without conversation history
+            max_concurrency: Maximum number of questions answered at once
+            
+        Returns:
+            One ask() response per question, in order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def answer(question: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aask(question)
+        
+        return await asyncio.gather(*(answer(question) for question in questions))
+    
+    def ask_batch(self, questions: List[str], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Blocking version of aask_batch(), for scripts.
+        
+        Runs on the process-wide background loop rather than asyncio.run(),
+        whose fresh loop per call would strand the OpenAI async clients'
+        pooled connections.
+        """
+        return _run_async(self.aask_batch(questions, max_concurrency))
+    
+    async def astream_ask(
+        self,
+        question: str,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a response as events, for callers running an event loop.
+        
+        Yields {"type": "token", "data": chunk} for each answer chunk, then a
+        final {"type": "sources", "data": pages}. Sources come from the same
+        chain run as the answer, so no second retrieval is made.
+        """
+        if is_conversational_query(question):
+            async for chunk in self.rag_chain.get_conversational_chain().astream(question):
+                yield {"type": "token", "data": chunk}
+            yield {"type": "sources", "data": []}
+            return
+        
+        question_with_context = await self._aquestion_with_context(question, conversation_history)
+        documents: List[Document] = []
+        async for chunk in self.rag_chain.get_chain_with_sources().astream(question_with_context):
+            if "docs" in chunk:
+                documents = chunk["docs"]
+            if "answer" in chunk:
+                yield {"type": "token", "data": chunk["answer"]}
+        yield {"type": "sources", "data": _source_pages(documents)}
+    
     def get_sources(self, question: str) -> List:
         """Get source pages for a question."""
         if is_conversational_query(question):
             return []
+        # The query embedding is cached, and an answered question already
+        # carries its sources in the answer cache
+        cached = self._answers().get(self.rag_chain.vector_store_manager.embed_query(question))
+        if cached is not None:
+            return list(cached["sources"])
         sources = self.rag_chain.get_relevant_documents(question)
-        return list(set(doc.metadata.get("page", "N/A") for doc in sources))
+        return _source_pages(sources)
 
 
 def create_rag_chain(
@@ -0,0 +1,134 @@
+"""
+Semantic cache module.
+Maps query embeddings to previously computed results using cosine similarity,
+so repeated or paraphrased questions can skip the expensive pipeline.
+"""
+
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from config import SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL
+
+
+class SemanticCache:
+    """
+    In-process cache keyed by embedding similarity.
+    
+    Keys are L2-normalized on insert so a lookup is a single
+    matrix-vector product against every cached key. Entries expire ttl
+    seconds after insertion, which bounds how long results computed
+    before a resync (possibly by another process) can be served.
+    
+    Attributes:
+        threshold: Minimum cosine similarity for a cache hit
+        max_entries: Maximum number of cached entries
+        ttl: Seconds an entry stays valid (None: until evicted)
+    """
+    
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = SEMANTIC_CACHE_TTL
+    ):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum number of cached entries
+            ttl: Seconds an entry stays valid (None: until evicted)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self._hits: List[int] = []
+        # Insertion times (monotonic), in insertion order
+        self._inserted: List[float] = []
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        """Convert a vector to a unit-norm float32 array."""
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+    
+    def _drop_expired(self):
+        """Remove expired entries (a prefix, since entries stay in insertion order). Lock held."""
+        if self.ttl is None or not self._inserted:
+            return
+        cutoff = time.monotonic() - self.ttl
+        expired = 0
+        while expired < len(self._inserted) and self._inserted[expired] <= cutoff:
+            expired += 1
+        if expired:
+            self._vectors = self._vectors[expired:] if expired < len(self._values) else None
+            del self._values[:expired]
+            del self._hits[:expired]
+            del self._inserted[:expired]
+    
+    def get(self, vector: Sequence[float]) -> Optional[Any]:
+        """
+        Look up the value stored under the most similar key.
+        
+        Args:
+            vector: Query embedding
+        
+        Returns:
+            The cached value, or None if no key is similar enough
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            self._drop_expired()
+            if not self._values:
+                return None
+            similarities = self._vectors @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            self._hits[best] += 1
+            return self._values[best]
+    
+    def put(self, vector: Sequence[float], value: Any):
+        """
+        Store a value under an embedding key.
+        
+        Args:
+            vector: Query embedding
+            value: Result to cache
+        """
+        key = self._normalize(vector)
+        with self._lock:
+            self._drop_expired()
+            if len(self._values) >= self.max_entries:
+                # Counter-based eviction: drop the least-hit (oldest on ties) entry
+                victim = int(np.argmin(self._hits))
+                self._vectors = np.delete(self._vectors, victim, axis=0)
+                del self._values[victim]
+                del self._hits[victim]
+                del self._inserted[victim]
+            
+            if self._vectors is None:
+                self._vectors = key[np.newaxis, :]
+            else:
+                self._vectors = np.vstack([self._vectors, key])
+            self._values.append(value)
+            self._hits.append(0)
+            self._inserted.append(time.monotonic())
+    
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._vectors = None
+            self._values = []
+            self._hits = []
+            self._inserted = []
+    
+    def __len__(self) -> int:
+        return len(self._values)
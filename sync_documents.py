@@ -10,25 +10,94 @@ Usage:
 """
 
 import argparse
+import hashlib
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config import MODULES, get_module_config
-from document_loader import create_folder_processor
+from config import (
+    MODULES,
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_SIZE_TOKENS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_DIM,
+    EMBEDDING_MODEL,
+    TOKEN_ENCODING,
+    get_module_config,
+)
 from vector_store import create_vector_store_manager
 
 
+# Per-module record of indexed files, stored in the module's documents folder
+SYNC_STATE_FILE = ".sync_state.json"
+
+# Modules synced at the same time by sync_all_modules
+SYNC_MAX_PARALLEL_MODULES = 4
+
+# Chunks accumulated across files before they are embedded and stored: one
+# full round of concurrent embedding batches, also bounding memory and the
+# work redone if a sync is interrupted
+SYNC_FLUSH_CHUNKS = EMBEDDING_BATCH_SIZE * EMBEDDING_CONCURRENCY
+
+
 def get_enabled_modules() -> Dict[str, Dict[str, Any]]:
     """Get all enabled modules."""
     return {k: v for k, v in MODULES.items() if v.get("enabled", False)}
 
 
-def sync_module(module_id: str, clear_first: bool = False, verbose: bool = True) -> Dict[str, Any]:
+def compute_file_fingerprint(file_path: Path) -> str:
+    """Fingerprint a file together with the settings that shape its vectors."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    settings = (
+        TOKEN_ENCODING,
+        CHUNK_SIZE_TOKENS,
+        CHUNK_OVERLAP_TOKENS,
+        EMBEDDING_MODEL,
+        EMBEDDING_DIM
+    )
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()
+
+
+def load_sync_state(folder_path: Path, collection_name: str) -> Dict[str, str]:
+    """Load the {file_name: fingerprint} map recorded for a collection."""
+    try:
+        state = json.loads((folder_path / SYNC_STATE_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if state.get("collection") != collection_name:
+        return {}
+    return state.get("files", {})
+
+
+def save_sync_state(folder_path: Path, collection_name: str, files: Dict[str, str]):
+    """Write the sync state atomically."""
+    state_path = folder_path / SYNC_STATE_FILE
+    tmp_path = state_path.with_name(SYNC_STATE_FILE + ".tmp")
+    tmp_path.write_text(
+        json.dumps({"collection": collection_name, "files": files}, indent=2),
+        encoding="utf-8"
+    )
+    os.replace(tmp_path, state_path)
+
+
+def sync_module(
+    module_id: str,
+    clear_first: bool = False,
+    verbose: bool = True,
+    log: Callable[[str], None] = print,
+    load_workers: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Sync a single module's documents to Qdrant.
     
@@ -36,6 +105,9 @@ def sync_module(module_id: str, clear_first: bool = False, verbose: bool = True)
         module_id: ID of the module to sync
         clear_first: Whether to clear existing vectors first
         verbose: Whether to print progress
+        log: Function receiving each progress line (print by default)
+        load_workers: Loader processes for this module (defaults to
+            LOAD_DOCUMENTS_NUMBER_OF_THREADS, else CPU count - 1)
         
     Returns:
         Dict with sync results
@@ -43,12 +115,16 @@ def sync_module(module_id: str, clear_first: bool = False, verbose: bool = True)
     module_config = get_module_config(module_id)
     
     if verbose:
-        print(f"\n{'='*60}")
-        print(f"Syncing module: {module_config['name']} ({module_id})")
-        print(f"{'='*60}")
+        log(f"\n{'='*60}")
+        log(f"Syncing module: {module_config['name']} ({module_id})")
+        log(f"{'='*60}")
+    
+    # Imported here: the loader stack (PDF parsers, splitters, tokenizer)
+    # is only needed when files are actually processed
+    from document_loader import create_folder_processor
     
     # Initialize processors
-    doc_processor = create_folder_processor(module_config)
+    doc_processor = create_folder_processor(module_config, workers=load_workers)
     vector_manager = create_vector_store_manager(module_config)
     
     # Ensure folder exists
@@ -59,7 +135,7 @@ def sync_module(module_id: str, clear_first: bool = False, verbose: bool = True)
     
     if not pdf_files:
         if verbose:
-            print(f"  No PDF files found in: {doc_processor.folder_path}")
+            log(f"  No PDF files found in: {doc_processor.folder_path}")
         return {
             "module_id": module_id,
             "files_processed": 0,
@@ -69,46 +145,109 @@ def sync_module(module_id: str, clear_first: bool = False, verbose: bool = True)
         }
     
     if verbose:
-        print(f"  Found {len(pdf_files)} PDF file(s)")
+        log(f"  Found {len(pdf_files)} PDF file(s)")
+    
+    collection_name = module_config["collection_name"]
+    
+    # Rebuild collections created with a different embedding size
+    if not clear_first and vector_manager.collection_exists() and not vector_manager.has_expected_vector_size():
+        if verbose:
+            log(f"  Embedding size changed (now {EMBEDDING_DIM}), rebuilding collection...")
+        clear_first = True
+    
+    # Full loads (rebuild or new collection) insert with HNSW indexing off
+    # and build the index once at the end, instead of indexing as they go
+    bulk = clear_first or not vector_manager.collection_exists()
     
     # Clear existing vectors if requested
     if clear_first:
         if verbose:
-            print("  Clearing existing vectors...")
-        vector_manager.clear_collection()
+            log("  Clearing existing vectors...")
+        vector_manager.clear_collection(bulk=True)
+        synced_files: Dict[str, str] = {}
+    else:
+        # Trust the recorded state only if the collection still has vectors
+        collection_info = vector_manager.get_collection_info()
+        synced_files = load_sync_state(doc_processor.folder_path, collection_name) if collection_info["count"] > 0 else {}
     
-    # Process files
+    # Skip files whose content and chunking/embedding settings are unchanged
+    fingerprints = {}
+    to_process = []
+    for pdf_path in pdf_files:
+        fingerprint = compute_file_fingerprint(pdf_path)
+        if synced_files.get(pdf_path.name) == fingerprint:
+            if verbose:
+                log(f"  Unchanged, skipping: {pdf_path.name}")
+            continue
+        fingerprints[pdf_path.name] = fingerprint
+        to_process.append(pdf_path)
+    
+    # Process files, accumulating chunks across files and flushing them in
+    # groups of about SYNC_FLUSH_CHUNKS (add_documents embeds a group's
+    # batches concurrently)
     total_chunks = 0
     errors = []
+    pending_chunks = []
+    pending_files = []
+    replace_existing = not clear_first and vector_manager.collection_exists()
     
-    for result in doc_processor.process_all_files():
-        file_name = result["file_name"]
+    def flush():
+        nonlocal total_chunks
+        # Replace any vectors from a previous version of these files
+        if replace_existing:
+            vector_manager.delete_by_files(pending_files)
         
-        if result["success"]:
-            chunks = result["chunks"]
-            chunk_count = len(chunks)
-            
+        # Add to Qdrant
+        if pending_chunks:
             if verbose:
-                print(f"  Processing: {file_name} ({chunk_count} chunks)")
+                log(f"  Embedding {len(pending_chunks)} chunks from {len(pending_files)} file(s)...")
+            vector_manager.add_documents(pending_chunks)
+            total_chunks += len(pending_chunks)
+        
+        for file_name in pending_files:
+            synced_files[file_name] = fingerprints[file_name]
+        save_sync_state(doc_processor.folder_path, collection_name, synced_files)
+        pending_chunks.clear()
+        pending_files.clear()
+    
+    if bulk and to_process:
+        vector_manager.create_collection(bulk=True)
+    
+    try:
+        for result in doc_processor.process_all_files(files=to_process):
+            file_name = result["file_name"]
             
-            # Add to Qdrant
-            if chunks:
-                vector_manager.add_documents(chunks)
-                total_chunks += chunk_count
-        else:
-            error_msg = f"{file_name}: {result['error']}"
-            errors.append(error_msg)
-            if verbose:
-                print(f"  ERROR: {error_msg}")
+            if result["success"]:
+                chunks = result["chunks"]
+                
+                if verbose:
+                    log(f"  Processing: {file_name} ({len(chunks)} chunks)")
+                
+                pending_chunks.extend(chunks)
+                pending_files.append(file_name)
+                if len(pending_chunks) >= SYNC_FLUSH_CHUNKS:
+                    flush()
+            else:
+                error_msg = f"{file_name}: {result['error']}"
+                errors.append(error_msg)
+                if verbose:
+                    log(f"  ERROR: {error_msg}")
+        
+        if pending_files:
+            flush()
+    finally:
+        if bulk and to_process:
+            vector_manager.finalize_bulk()
     
     if verbose:
-        print(f"\n  Total chunks added: {total_chunks}")
+        log(f"\n  Total chunks added: {total_chunks}")
         if errors:
-            print(f"  Errors: {len(errors)}")
+            log(f"  Errors: {len(errors)}")
     
     return {
         "module_id": module_id,
-        "files_processed": len(pdf_files),
+        "files_processed": len(to_process),
+        "files_skipped": len(pdf_files) - len(to_process),
         "chunks_added": total_chunks,
         "errors": errors,
         "success": len(errors) == 0
@@ -116,17 +255,51 @@ def sync_module(module_id: str, clear_first: bool = False, verbose: bool = True)
 
 
 def sync_all_modules(clear_first: bool = False) -> List[Dict[str, Any]]:
-    """Sync all enabled modules."""
-    results = []
+    """
+    Sync all enabled modules.
+    
+    Modules are independent and mostly wait on OpenAI and Qdrant, so they
+    sync concurrently in threads; each module's progress is buffered and
+    printed in one block when it finishes. The loader process budget is
+    split between the modules running at once, so the CPU isn't
+    oversubscribed.
+    """
     enabled_modules = get_enabled_modules()
     
     print(f"\nSyncing {len(enabled_modules)} enabled module(s)...")
+    if not enabled_modules:
+        return []
+    
+    from document_loader import get_load_workers
     
-    for module_id in enabled_modules:
-        result = sync_module(module_id, clear_first=clear_first)
-        results.append(result)
+    parallel_modules = min(SYNC_MAX_PARALLEL_MODULES, len(enabled_modules))
+    load_workers = max(1, get_load_workers() // parallel_modules)
+    logs: Dict[str, List[str]] = {module_id: [] for module_id in enabled_modules}
+    results: Dict[str, Dict[str, Any]] = {}
     
-    return results
+    with ThreadPoolExecutor(max_workers=parallel_modules) as executor:
+        futures = {
+            executor.submit(
+                sync_module, module_id, clear_first, True, logs[module_id].append, load_workers
+            ): module_id
+            for module_id in enabled_modules
+        }
+        for future in as_completed(futures):
+            module_id = futures[future]
+            try:
+                results[module_id] = future.result()
+            except Exception as e:
+                logs[module_id].append(f"  ERROR: {str(e)}")
+                results[module_id] = {
+                    "module_id": module_id,
+                    "files_processed": 0,
+                    "chunks_added": 0,
+                    "errors": [str(e)],
+                    "success": False
+                }
+            print("\n".join(logs[module_id]))
+    
+    return [results[module_id] for module_id in enabled_modules]
 
 
 def show_status():
@@ -144,10 +317,12 @@ def show_status():
         if enabled:
             # Check folder
             folder_path = Path(module_config["documents_folder"])
-            if folder_path.exists():
-                pdf_count = len(list(folder_path.glob("*.pdf")))
+            try:
+                # One directory pass, no Path objects built
+                with os.scandir(folder_path) as entries:
+                    pdf_count = sum(1 for e in entries if e.name.lower().endswith(".pdf") and e.is_file())
                 print(f"   Folder: {folder_path} ({pdf_count} PDFs)")
-            else:
+            except FileNotFoundError:
                 print(f"   Folder: {folder_path} (NOT FOUND)")
             
             # Check Qdrant collection
@@ -0,0 +1,135 @@
+"""
+Unit tests for conversation history formatting and conversational query detection.
+"""
+
+import asyncio
+import re
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rag_chain import RAGQueryHandler, is_conversational_query
+
+
+class FakeSummaryChain:
+    """Stands in for the summarization LLM chain, recording each fold."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return f"S{len(self.calls)}"
+    
+    async def ainvoke(self, inputs):
+        return self.invoke(inputs)
+
+
+def _history(message_count):
+    """Initial greeting followed by message_count alternating user/assistant messages."""
+    history = [{"role": "assistant", "content": "Bonjour"}]
+    for i in range(message_count):
+        history.append({"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"})
+    return history
+
+
+class FormatConversationHistoryTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.handler = RAGQueryHandler(rag_chain=None)
+        self.chain = FakeSummaryChain()
+        self.handler._summarizer._chain = self.chain
+    
+    def verbatim(self, text):
+        return [line for line in text.split("\n") if not line.startswith("Résumé")]
+    
+    def test_no_history(self):
+        self.assertEqual(self.handler._format_conversation_history(_history(0)), "")
+    
+    def test_short_history_is_verbatim(self):
+        text = self.handler._format_conversation_history(_history(10))
+        self.assertEqual(self.chain.calls, [])
+        self.assertEqual(len(self.verbatim(text)), 10)
+        self.assertTrue(text.startswith("Utilisateur: m0"))
+    
+    def test_tail_is_capped_at_max_exchanges(self):
+        for count in (11, 19, 20, 21, 35):
+            with self.subTest(count=count):
+                text = self.handler._format_conversation_history(_history(count), max_exchanges=5)
+                lines = self.verbatim(text)
+                self.assertEqual(len(lines), 10)
+                self.assertTrue(lines[-1].endswith(f"m{count - 1}"))
+                self.assertTrue(text.startswith("Résumé des échanges précédents: "))
+    
+    def test_older_messages_are_folded_one_window_at_a_time(self):
+        # 31 messages: 21 older ones -> windows of 10, 10 and 1
+        self.handler._format_conversation_history(_history(31))
+        self.assertEqual(len(self.chain.calls), 3)
+        self.assertEqual([call["summary"] for call in self.chain.calls], ["(aucun)", "S1", "S2"])
+        self.assertEqual(
+            [call["conversation"].count("\n") + 1 for call in self.chain.calls], [10, 10, 1]
+        )
+    
+    def test_next_turn_only_folds_the_last_window(self):
+        self.handler._format_conversation_history(_history(31))
+        self.handler._format_conversation_history(_history(32))
+        # Full windows come from the cache; only the changed last window is folded
+        self.assertEqual(len(self.chain.calls), 4)
+        self.assertEqual(self.chain.calls[-1]["summary"], "S2")
+        self.assertEqual(self.chain.calls[-1]["conversation"], "Utilisateur: m20\nAssistant: m21")
+    
+    def test_async_matches_sync(self):
+        history = _history(27)
+        expected = self.handler._format_conversation_history(history)
+        self.assertEqual(asyncio.run(self.handler._aformat_conversation_history(history)), expected)
+
+
+# Detection before conversational patterns became literal prefixes/replies
+OLD_CONVERSATIONAL_PATTERNS = [
+    r"^(salut|bonjour|bonsoir|hello|hi|hey|coucou)",
+    r"^(ça va|comment vas|comment tu vas|tu vas bien|comment allez)",
+    r"^(merci|thanks|thank you)",
+    r"^(au revoir|bye|à bientôt|à plus)",
+    r"^(qui es[ -]tu|tu es qui|c'est quoi|présente[ -]toi)",
+    r"^(ok|d'accord|compris|super|parfait|génial|cool)$",
+    r"^(oui|non|ouais|nope)$",
+]
+OLD_LEGAL_KEYWORDS = [
+    "impôt", "taxe", "tva", "is", "ir", "fiscal", "taux", "article",
+    "cgi", "déclar", "exonér", "société", "revenu", "bénéfice",
+    "auto-entrepreneur", "travail", "contrat", "licenciement", "congé",
+    "salaire", "employeur", "salarié", "cdd", "cdi", "préavis",
+    "indemnité", "syndicat", "grève", "heures", "smig"
+]
+
+
+def old_is_conversational_query(question):
+    question_lower = question.lower().strip()
+    for pattern in OLD_CONVERSATIONAL_PATTERNS:
+        if re.search(pattern, question_lower, re.IGNORECASE):
+            return True
+    return len(question_lower) < 15 and not any(kw in question_lower for kw in OLD_LEGAL_KEYWORDS)
+
+
+class IsConversationalQueryTest(unittest.TestCase):
+    
+    QUESTIONS = [
+        "Bonjour", "bonjour, quel est le taux de TVA ?", "  Merci beaucoup  ", "Thank you!",
+        "Hi there", "heyyy", "Coucou", "Ça va ?", "Comment allez-vous", "à plus", "Au revoir",
+        "Qui es-tu ?", "qui es tu", "Tu es qui", "Présente-toi", "présente toi",
+        "C'est quoi la TVA ?", "OK", "ok merci", "okay", "Oui", "non.", "Super",
+        "supermarché et TVA", "Quel est le taux de l'IS ?", "Article 10 du CGI",
+        "history of tax", "préavis", "Calcul de l'indemnité de licenciement", "",
+    ]
+    
+    def test_matches_previous_regex_detection(self):
+        for question in self.QUESTIONS:
+            with self.subTest(question=question):
+                self.assertEqual(is_conversational_query(question), old_is_conversational_query(question))
+
+
+if __name__ == "__main__":
+    unittest.main()
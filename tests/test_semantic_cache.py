@@ -0,0 +1,107 @@
+"""
+Unit tests for the semantic cache.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from semantic_cache import SemanticCache
+
+
+class SemanticCacheTest(unittest.TestCase):
+    
+    def test_hit_above_threshold(self):
+        cache = SemanticCache(threshold=0.95, max_entries=4)
+        cache.put([1.0, 0.0], "answer")
+        # cos = 0.99..., and the key is normalized so magnitude doesn't matter
+        self.assertEqual(cache.get([10.0, 1.0]), "answer")
+    
+    def test_miss_below_threshold(self):
+        cache = SemanticCache(threshold=0.95, max_entries=4)
+        cache.put([1.0, 0.0], "answer")
+        # cos = 0.707
+        self.assertIsNone(cache.get([1.0, 1.0]))
+    
+    def test_empty_cache_misses(self):
+        self.assertIsNone(SemanticCache().get([1.0, 0.0]))
+    
+    def test_returns_most_similar_entry(self):
+        cache = SemanticCache(threshold=0.5, max_entries=4)
+        cache.put([1.0, 0.0], "x")
+        cache.put([0.0, 1.0], "y")
+        self.assertEqual(cache.get([0.2, 1.0]), "y")
+    
+    def test_evicts_least_hit_entry(self):
+        cache = SemanticCache(threshold=0.95, max_entries=2)
+        cache.put([1.0, 0.0], "x")
+        cache.put([0.0, 1.0], "y")
+        cache.get([1.0, 0.0])
+        cache.put([1.0, 1.0], "z")
+        
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get([1.0, 0.0]), "x")
+        self.assertIsNone(cache.get([0.0, 1.0]))
+        self.assertEqual(cache.get([1.0, 1.0]), "z")
+    
+    def test_evicts_oldest_on_tied_hits(self):
+        cache = SemanticCache(threshold=0.95, max_entries=2)
+        cache.put([1.0, 0.0], "x")
+        cache.put([0.0, 1.0], "y")
+        cache.put([1.0, 1.0], "z")
+        
+        self.assertIsNone(cache.get([1.0, 0.0]))
+        self.assertEqual(cache.get([0.0, 1.0]), "y")
+    
+    def test_zero_vector_is_not_normalized_to_nan(self):
+        normalized = SemanticCache._normalize([0.0, 0.0, 0.0])
+        self.assertFalse(np.isnan(normalized).any())
+        self.assertEqual(normalized.dtype, np.float32)
+    
+    def test_zero_vector_never_hits(self):
+        cache = SemanticCache(threshold=0.95, max_entries=4)
+        cache.put([0.0, 0.0], "zero")
+        cache.put([1.0, 0.0], "x")
+        self.assertIsNone(cache.get([0.0, 0.0]))
+        self.assertEqual(cache.get([1.0, 0.0]), "x")
+    
+    def test_entries_expire_after_ttl(self):
+        cache = SemanticCache(threshold=0.95, max_entries=4, ttl=10)
+        with mock.patch("semantic_cache.time.monotonic", return_value=100.0):
+            cache.put([1.0, 0.0], "old")
+        with mock.patch("semantic_cache.time.monotonic", return_value=105.0):
+            cache.put([0.0, 1.0], "new")
+        
+        with mock.patch("semantic_cache.time.monotonic", return_value=109.0):
+            self.assertEqual(cache.get([1.0, 0.0]), "old")
+        with mock.patch("semantic_cache.time.monotonic", return_value=112.0):
+            self.assertIsNone(cache.get([1.0, 0.0]))
+            self.assertEqual(cache.get([0.0, 1.0]), "new")
+            self.assertEqual(len(cache), 1)
+        with mock.patch("semantic_cache.time.monotonic", return_value=120.0):
+            self.assertIsNone(cache.get([0.0, 1.0]))
+            self.assertEqual(len(cache), 0)
+    
+    def test_no_ttl_keeps_entries(self):
+        cache = SemanticCache(threshold=0.95, max_entries=4, ttl=None)
+        with mock.patch("semantic_cache.time.monotonic", return_value=0.0):
+            cache.put([1.0, 0.0], "x")
+        with mock.patch("semantic_cache.time.monotonic", return_value=1e9):
+            self.assertEqual(cache.get([1.0, 0.0]), "x")
+    
+    def test_clear(self):
+        cache = SemanticCache()
+        cache.put([1.0, 0.0], "x")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get([1.0, 0.0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Unit tests for the vector store's pure helpers.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from vector_store import VectorStoreManager
+
+
+def _doc(chars: int) -> Document:
+    return Document(page_content="x" * chars)
+
+
+class PackBatchesTest(unittest.TestCase):
+    
+    def pack(self, sizes, **kwargs):
+        documents = [_doc(size) for size in sizes]
+        batches = list(VectorStoreManager._pack_batches(documents, **kwargs))
+        # Every document is sent exactly once, in order
+        self.assertEqual([doc for batch in batches for doc in batch], documents)
+        return [[len(doc.page_content) for doc in batch] for batch in batches]
+    
+    def test_empty(self):
+        self.assertEqual(self.pack([]), [])
+    
+    def test_item_cap(self):
+        self.assertEqual(
+            self.pack([4] * 5, max_tokens=1000, max_items=2),
+            [[4, 4], [4, 4], [4]]
+        )
+    
+    def test_token_cap(self):
+        # 396 chars ~ 100 tokens each
+        self.assertEqual(
+            self.pack([396] * 5, max_tokens=250, max_items=100),
+            [[396, 396], [396, 396], [396]]
+        )
+    
+    def test_batch_filled_exactly_to_token_cap(self):
+        self.assertEqual(
+            self.pack([396, 396], max_tokens=200, max_items=100),
+            [[396, 396]]
+        )
+    
+    def test_oversized_document_gets_its_own_batch(self):
+        self.assertEqual(
+            self.pack([4, 4000, 4], max_tokens=100, max_items=100),
+            [[4], [4000], [4]]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
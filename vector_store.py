@@ -4,18 +4,183 @@ Handles embedding storage and retrieval for any module.
 Supports local Qdrant instance or Qdrant Cloud.
 """
 
+import asyncio
+import atexit
 import os
 import hashlib
-from typing import List, Optional, Dict, Any
-from uuid import uuid4
+import sqlite3
+import threading
+from collections import OrderedDict
+from array import array
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, Iterable, Iterator, List, Optional
+from uuid import UUID
 
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import Distance, VectorParams
 
-from config import ModelConfig, QdrantConfig, get_openai_api_key
+from config import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_CACHE_FILE,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_DIM,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_MODEL,
+    QDRANT_GRPC_PORT,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_HNSW_EF_SEARCH,
+    QDRANT_HNSW_M,
+    QDRANT_HOST,
+    QDRANT_INDEXING_THRESHOLD,
+    QDRANT_PORT,
+    QDRANT_PREFER_GRPC,
+    QDRANT_QUANTIZATION,
+    QDRANT_QUANTIZATION_OVERSAMPLING,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_THRESHOLD,
+    SEARCH_CACHE_TTL,
+    get_openai_api_key,
+    get_openai_http_client,
+)
+
+# langchain_openai and the MMR helpers are imported where used: status and
+# maintenance commands only talk to Qdrant
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
+
+
+# Long-lived event loop for async embedding calls (see _run_async)
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_loop_lock = threading.Lock()
+
+
+def _run_async(coro: Coroutine) -> Any:
+    """
+    Run a coroutine on a background event loop shared by the whole process.
+    
+    The embeddings' async OpenAI client keeps pooled connections bound to the
+    loop that opened them; asyncio.run() would start a fresh loop per call
+    and strand those connections. Safe to call from any thread.
+    """
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            threading.Thread(target=_async_loop.run_forever, name="embeddings-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _async_loop).result()
+
+
+@lru_cache(maxsize=None)
+def _get_openai_embeddings(model: str, dimensions: int, api_key: str) -> "OpenAIEmbeddings":
+    """
+    Get the embeddings client for a model, shared by every VectorStoreManager.
+    
+    One instance per (model, dimensions, api_key) keeps a single OpenAI
+    client (and its async connection pool) across modules and syncs.
+    """
+    from langchain_openai import OpenAIEmbeddings
+    
+    return OpenAIEmbeddings(
+        model=model,
+        dimensions=dimensions,
+        openai_api_key=api_key,
+        http_client=get_openai_http_client(),
+        chunk_size=EMBEDDING_BATCH_SIZE,
+        max_retries=EMBEDDING_MAX_RETRIES
+    )
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of text embeddings.
+    
+    Entries are keyed by a hash of the embedding model, its dimensions and
+    the text, so an unchanged chunk is never embedded twice, whichever file
+    or module it comes from. Vectors are stored as float32, the precision
+    Qdrant keeps anyway. Cache failures are treated as misses so they
+    never block indexing.
+    """
+    
+    # Keys per SELECT, below SQLite's bound-parameter limit
+    _QUERY_CHUNK = 500
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the embedding cache.
+        
+        Args:
+            db_path: Path to the SQLite database file (created on first use)
+        """
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB)")
+            self._conn = conn
+        return self._conn
+    
+    @staticmethod
+    def key(model: str, dimensions: int, text: str) -> bytes:
+        """Cache key of a text embedded with a given model and size."""
+        return hashlib.blake2b(f"{model}:{dimensions}:{text}".encode(), digest_size=16).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, array]:
+        """Return the cached float32 vectors among keys (missing keys are left out)."""
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for i in range(0, len(keys), self._QUERY_CHUNK):
+                    chunk = keys[i:i + self._QUERY_CHUNK]
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    )
+                    for key, blob in rows:
+                        found[key] = array("f", blob)
+        except sqlite3.Error:
+            return {}
+        return found
+    
+    def put_many(self, items: Dict[bytes, array]):
+        """Store float32 vectors under their keys."""
+        rows = [(key, vector.tobytes()) for key, vector in items.items()]
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", rows)
+        except sqlite3.Error:
+            pass
+
+
+@lru_cache(maxsize=1)
+def _get_embedding_cache() -> EmbeddingCache:
+    """Get the embedding cache shared by every VectorStoreManager."""
+    return EmbeddingCache(EMBEDDING_CACHE_FILE)
+
+
+@lru_cache(maxsize=4)
+def _get_shared_client(**kwargs) -> QdrantClient:
+    """Get the Qdrant client for a connection, shared by every VectorStoreManager."""
+    client = QdrantClient(**kwargs)
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=4)
+def _get_shared_async_client(**kwargs) -> AsyncQdrantClient:
+    """Get the async Qdrant client for a connection (only used on the _run_async loop)."""
+    return AsyncQdrantClient(**kwargs)
 
 
 class VectorStoreManager:
@@ -27,7 +192,7 @@ class VectorStoreManager:
     def __init__(
         self,
         collection_name: str,
-        embedding_model: str = ModelConfig.EMBEDDING_MODEL
+        embedding_model: str = EMBEDDING_MODEL
     ):
         """
         Initialize the vector store manager.
@@ -38,67 +203,118 @@ class VectorStoreManager:
         """
         self.collection_name = collection_name
         self.embedding_model = embedding_model
-        self._embeddings: Optional[OpenAIEmbeddings] = None
+        self._embeddings: Optional["OpenAIEmbeddings"] = None
         self._client: Optional[QdrantClient] = None
-        self._vector_size = 1536  # text-embedding-3-small dimensions
+        self._async_client: Optional[AsyncQdrantClient] = None
+        self._vector_size = EMBEDDING_DIM
+        self._retrievers: Dict[tuple, Any] = {}
+        # Semantic caches of search results, one per (search type, parameters)
+        self._search_caches: Dict[tuple, Any] = {}
+        # Bumped on every write through this manager, so caches built on its
+        # results (e.g. answers) can tell they are stale
+        self.data_version = 0
+        # Only a positive answer is cached: another process may create the collection
+        self._collection_known_to_exist = False
+        # Query embeddings keyed by normalized query, least recently used first
+        self._query_vectors: "OrderedDict[str, tuple]" = OrderedDict()
+        self._query_lock = threading.Lock()
+    
+    @staticmethod
+    def _client_kwargs() -> Dict[str, Any]:
+        """Connection settings: Qdrant Cloud if configured, else the local instance."""
+        # Check for cloud configuration (env vars first, then Streamlit secrets)
+        qdrant_url = os.getenv("QDRANT_URL")
+        qdrant_api_key = os.getenv("QDRANT_API_KEY")
+        
+        # Try Streamlit secrets if not in env
+        if not qdrant_url or not qdrant_api_key:
+            try:
+                import streamlit as st
+                if hasattr(st, 'secrets'):
+                    qdrant_url = st.secrets.get("QDRANT_URL", qdrant_url)
+                    qdrant_api_key = st.secrets.get("QDRANT_API_KEY", qdrant_api_key)
+            except Exception:
+                pass
+        
+        transport = {"prefer_grpc": QDRANT_PREFER_GRPC, "grpc_port": QDRANT_GRPC_PORT}
+        if qdrant_url and qdrant_api_key:
+            # Qdrant Cloud
+            return {"url": qdrant_url, "api_key": qdrant_api_key, **transport}
+        # Local Qdrant
+        return {"host": QDRANT_HOST, "port": QDRANT_PORT, **transport}
     
     def _get_client(self) -> QdrantClient:
-        """Get or create the Qdrant client."""
+        """Get the Qdrant client, shared with other managers on the same connection."""
         if self._client is None:
-            # Check for cloud configuration (env vars first, then Streamlit secrets)
-            qdrant_url = os.getenv("QDRANT_URL")
-            qdrant_api_key = os.getenv("QDRANT_API_KEY")
-            
-            # Try Streamlit secrets if not in env
-            if not qdrant_url or not qdrant_api_key:
-                try:
-                    import streamlit as st
-                    if hasattr(st, 'secrets'):
-                        qdrant_url = st.secrets.get("QDRANT_URL", qdrant_url)
-                        qdrant_api_key = st.secrets.get("QDRANT_API_KEY", qdrant_api_key)
-                except Exception:
-                    pass
-            
-            if qdrant_url and qdrant_api_key:
-                # Qdrant Cloud
-                self._client = QdrantClient(
-                    url=qdrant_url,
-                    api_key=qdrant_api_key
-                )
-            else:
-                # Local Qdrant
-                self._client = QdrantClient(
-                    host=QdrantConfig.HOST,
-                    port=QdrantConfig.PORT
-                )
+            self._client = _get_shared_client(**self._client_kwargs())
         return self._client
     
-    def _get_embeddings(self) -> OpenAIEmbeddings:
+    def _get_async_client(self) -> AsyncQdrantClient:
+        """Get the shared async Qdrant client (only used on the _run_async loop)."""
+        if self._async_client is None:
+            self._async_client = _get_shared_async_client(**self._client_kwargs())
+        return self._async_client
+    
+    def _get_embeddings(self) -> "OpenAIEmbeddings":
         """Get or create the embeddings instance."""
         if self._embeddings is None:
-            api_key = get_openai_api_key()
-            self._embeddings = OpenAIEmbeddings(
-                model=self.embedding_model,
-                openai_api_key=api_key
+            self._embeddings = _get_openai_embeddings(
+                self.embedding_model, self._vector_size, get_openai_api_key()
             )
         return self._embeddings
     
-    def _generate_doc_id(self, doc: Document) -> str:
-        """Generate a unique ID for a document based on content hash."""
+    @staticmethod
+    def _generate_doc_id(doc: Document) -> str:
+        """
+        Generate a deterministic point ID from the chunk's file, page and chunk number.
+        
+        Re-adding the same chunk overwrites its point instead of duplicating it.
+        Qdrant string IDs must be UUIDs, so the 128-bit digest is formatted as one.
+        """
         content = f"{doc.metadata.get('file_name', '')}_{doc.metadata.get('page', '')}_{doc.metadata.get('chunk_id', '')}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return str(UUID(bytes=hashlib.blake2b(content.encode(), digest_size=16).digest()))
     
     def collection_exists(self) -> bool:
-        """Check if the collection already exists."""
+        """Check if the collection already exists (remembered once it does)."""
+        if self._collection_known_to_exist:
+            return True
         try:
-            client = self._get_client()
-            collections = client.get_collections().collections
-            return any(c.name == self.collection_name for c in collections)
+            self._collection_known_to_exist = self._get_client().collection_exists(self.collection_name)
         except Exception:
             return False
+        return self._collection_known_to_exist
     
-    def create_collection(self):
-        """Create a new collection if it doesn't exist."""
+    def has_expected_vector_size(self) -> bool:
+        """Check that an existing collection was built with the configured embedding size."""
+        client = self._get_client()
+        info = client.get_collection(self.collection_name)
+        return info.config.params.vectors.size == self._vector_size
+    
+    @staticmethod
+    def _quantization_config():
+        """Quantization for new collections, per QDRANT_QUANTIZATION."""
+        if QDRANT_QUANTIZATION == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        if QDRANT_QUANTIZATION == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        raise ValueError(f"QDRANT_QUANTIZATION '{QDRANT_QUANTIZATION}' non supporté (scalar, binary)")
+    
+    def create_collection(self, bulk: bool = False):
+        """
+        Create a new collection if it doesn't exist.
+        
+        Args:
+            bulk: Create it with HNSW indexing disabled, for a bulk load
+                followed by finalize_bulk()
+        """
         client = self._get_client()
         
         if not self.collection_exists():
@@ -107,56 +323,169 @@ class VectorStoreManager:
                 vectors_config=VectorParams(
                     size=self._vector_size,
                     distance=Distance.COSINE
-                )
+                ),
+                hnsw_config=models.HnswConfigDiff(
+                    m=QDRANT_HNSW_M,
+                    ef_construct=QDRANT_HNSW_EF_CONSTRUCT
+                ),
+                # Chunk text is only read for the few returned points
+                on_disk_payload=True,
+                optimizers_config=models.OptimizersConfigDiff(
+                    indexing_threshold=0 if bulk else QDRANT_INDEXING_THRESHOLD
+                ),
+                quantization_config=self._quantization_config()
             )
+            # Keyword index so delete_by_files filters by lookup instead of a full scan
+            client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name="file_name",
+                field_schema=models.PayloadSchemaType.KEYWORD
+            )
+            self._collection_known_to_exist = True
+    
+    def finalize_bulk(self):
+        """Re-enable HNSW indexing after a bulk load; the index is built once, in the background."""
+        self._get_client().update_collection(
+            collection_name=self.collection_name,
+            optimizers_config=models.OptimizersConfigDiff(
+                indexing_threshold=QDRANT_INDEXING_THRESHOLD
+            )
+        )
+    
+    @classmethod
+    def _build_batch(cls, documents: List[Document], vectors: Iterable[array]) -> models.Batch:
+        """Build one columnar Qdrant batch from documents and their float32 embeddings."""
+        return models.Batch(
+            ids=[cls._generate_doc_id(doc) for doc in documents],
+            vectors=[vector.tolist() for vector in vectors],
+            payloads=[
+                {
+                    "content": doc.page_content,
+                    "file_name": doc.metadata.get("file_name", "unknown"),
+                    "page": doc.metadata.get("page", 0),
+                    "chunk_id": doc.metadata.get("chunk_id", 0),
+                    "source": doc.metadata.get("source", ""),
+                    "module": doc.metadata.get("module", "")
+                }
+                for doc in documents
+            ]
+        )
+    
+    async def _aadd_documents(self, batches: List[List[Document]]):
+        """
+        Embed and upsert batches concurrently, bounded to stay within rate limits.
+        
+        Each batch is upserted as soon as its embeddings arrive, so Qdrant
+        writes overlap with the embedding requests still in flight. Only
+        texts missing from the embedding cache are sent to OpenAI.
+        """
+        embeddings = self._get_embeddings()
+        client = self._get_async_client()
+        cache = _get_embedding_cache()
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+        
+        async def add(batch: List[Document]):
+            async with semaphore:
+                keys = [
+                    cache.key(self.embedding_model, self._vector_size, doc.page_content)
+                    for doc in batch
+                ]
+                vectors_by_key = await asyncio.to_thread(cache.get_many, keys)
+                missing = {key: doc.page_content for key, doc in zip(keys, batch) if key not in vectors_by_key}
+                if missing:
+                    # Held as float32 (what Qdrant stores) rather than lists of Python floats
+                    new_vectors = {
+                        key: array("f", vector)
+                        for key, vector in zip(missing, await embeddings.aembed_documents(list(missing.values())))
+                    }
+                    await asyncio.to_thread(cache.put_many, new_vectors)
+                    vectors_by_key.update(new_vectors)
+                
+                # One columnar Batch instead of a validated PointStruct per point
+                await client.upsert(
+                    collection_name=self.collection_name,
+                    points=self._build_batch(batch, [vectors_by_key[key] for key in keys])
+                )
+        
+        tasks = [asyncio.ensure_future(add(batch)) for batch in batches]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the other batches before the error reaches the caller, so
+            # nothing is written after add_documents() has failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
     
-    def add_documents(self, documents: List[Document], batch_size: int = 100):
+    @staticmethod
+    def _pack_batches(
+        documents: List[Document],
+        max_tokens: int = EMBEDDING_BATCH_TOKENS,
+        max_items: int = EMBEDDING_BATCH_SIZE
+    ) -> Iterator[List[Document]]:
+        """
+        Greedily pack documents into embeddings requests.
+        
+        A batch is closed as soon as adding the next document would exceed
+        either cap, so short chunks fill a request and long ones don't push
+        it past the API's per-request token limit.
+        
+        Args:
+            documents: Documents to pack, in the order they are sent
+            max_tokens: Estimated token budget per request
+            max_items: Maximum number of documents per request
+        """
+        batch: List[Document] = []
+        batch_tokens = 0
+        for doc in documents:
+            # ~4 characters per token; cheap enough to skip a tokenizer pass
+            tokens = len(doc.page_content) // 4 + 1
+            if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(doc)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+    
+    def add_documents(self, documents: List[Document], batch_size: int = EMBEDDING_BATCH_SIZE):
         """
         Add documents to the vector store.
         
         Args:
             documents: List of documents to add
-            batch_size: Number of documents to process at once
+            batch_size: Maximum number of documents per embeddings request
         """
-        client = self._get_client()
-        embeddings = self._get_embeddings()
-        
         # Ensure collection exists
         self.create_collection()
         
-        # Process in batches
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            
-            # Generate embeddings
-            texts = [doc.page_content for doc in batch]
-            vectors = embeddings.embed_documents(texts)
-            
-            # Create points
-            points = []
-            for doc, vector in zip(batch, vectors):
-                point_id = str(uuid4())
-                points.append(PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload={
-                        "content": doc.page_content,
-                        "file_name": doc.metadata.get("file_name", "unknown"),
-                        "page": doc.metadata.get("page", 0),
-                        "chunk_id": doc.metadata.get("chunk_id", 0),
-                        "source": doc.metadata.get("source", ""),
-                        "module": doc.metadata.get("module", "")
-                    }
-                ))
-            
-            # Upsert points
-            client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
+        # Group similar lengths in the same batch; each point keeps its own
+        # document, so the insertion order doesn't matter
+        documents = sorted(documents, key=lambda doc: len(doc.page_content))
+        batches = list(self._pack_batches(documents, max_items=batch_size))
+        try:
+            _run_async(self._aadd_documents(batches))
+        finally:
+            self._invalidate_search_caches()
     
     def delete_by_file(self, file_name: str):
         """Delete all vectors associated with a specific file."""
+        self.delete_by_files([file_name])
+    
+    def delete_by_files(self, file_names: List[str]):
+        """
+        Delete all vectors associated with any of the given files.
+        
+        One request with a MatchAny filter, resolved against the file_name
+        keyword index, instead of a round-trip per file.
+        
+        Args:
+            file_names: Names of the files whose vectors are deleted
+        """
+        if not file_names:
+            return
         client = self._get_client()
         
         client.delete(
@@ -166,12 +495,13 @@ class VectorStoreManager:
                     must=[
                         models.FieldCondition(
                             key="file_name",
-                            match=models.MatchValue(value=file_name)
+                            match=models.MatchAny(any=list(file_names))
                         )
                     ]
                 )
             )
         )
+        self._invalidate_search_caches()
     
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection."""
@@ -186,61 +516,250 @@ class VectorStoreManager:
             "count": info.points_count
         }
     
-    def similarity_search(self, query: str, k: int = 8) -> List[Document]:
-        """Perform similarity search on the vector store."""
-        client = self._get_client()
-        embeddings = self._get_embeddings()
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Lowercase and collapse whitespace so equivalent queries share a cache entry."""
+        return " ".join(query.lower().split())
+    
+    def _embed_query_cached(self, query: str) -> tuple:
+        """Embed a query, memoized on its normalized form."""
+        key = self._normalize_query(query)
+        with self._query_lock:
+            vector = self._query_vectors.get(key)
+            if vector is not None:
+                self._query_vectors.move_to_end(key)
+                return vector
+        
+        # The original text is embedded: case and spacing can matter to the
+        # model (abbreviations, article references)
+        vector = tuple(self._get_embeddings().embed_query(query))
+        with self._query_lock:
+            self._query_vectors[key] = vector
+            self._query_vectors.move_to_end(key)
+            if len(self._query_vectors) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+        return vector
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query with the collection's embedding model.
         
-        # Generate query embedding
-        query_vector = embeddings.embed_query(query)
+        The cache is keyed on the lowercased, whitespace-collapsed query so
+        repeated or re-run questions reuse the embedding of the first one.
+        """
+        return list(self._embed_query_cached(query))
+    
+    # Payload fields read back by _point_to_document; anything else stored on
+    # a point stays on the server
+    _PAYLOAD_FIELDS = ["content", "file_name", "page", "chunk_id", "source", "module"]
+    
+    @staticmethod
+    def _point_to_document(point) -> Document:
+        """Convert a scored Qdrant point into a Document."""
+        return Document(
+            page_content=point.payload.get("content", ""),
+            metadata={
+                "file_name": point.payload.get("file_name", ""),
+                "page": point.payload.get("page", 0),
+                "chunk_id": point.payload.get("chunk_id", 0),
+                "source": point.payload.get("source", ""),
+                "module": point.payload.get("module", ""),
+                "score": point.score
+            }
+        )
+    
+    def _query_points(self, query_vector: List[float], limit: int, with_vectors: bool = False):
+        """Run a nearest-neighbour query against the collection."""
+        client = self._get_client()
         
         # Search using query method (newer qdrant-client API)
         results = client.query_points(
             collection_name=self.collection_name,
             query=query_vector,
-            limit=k,
-            with_payload=True
+            limit=limit,
+            with_payload=self._PAYLOAD_FIELDS,
+            with_vectors=with_vectors,
+            search_params=models.SearchParams(
+                hnsw_ef=QDRANT_HNSW_EF_SEARCH,
+                quantization=models.QuantizationSearchParams(
+                    rescore=True,
+                    oversampling=QDRANT_QUANTIZATION_OVERSAMPLING
+                )
+            )
         )
+        return results.points
+    
+    def similarity_search_by_vector(self, query_vector: List[float], k: int = 8) -> List[Document]:
+        """Perform similarity search from an already-computed query embedding."""
+        return [self._point_to_document(point) for point in self._query_points(query_vector, k)]
+    
+    def _cached_search(self, key: tuple, query: str, search: Callable[[List[float]], List[Document]]) -> List[Document]:
+        """
+        Run a search by query embedding, reusing the results of a near-identical earlier query.
         
-        # Convert to Documents
-        documents = []
-        for point in results.points:
-            doc = Document(
-                page_content=point.payload.get("content", ""),
-                metadata={
-                    "file_name": point.payload.get("file_name", ""),
-                    "page": point.payload.get("page", 0),
-                    "chunk_id": point.payload.get("chunk_id", 0),
-                    "source": point.payload.get("source", ""),
-                    "module": point.payload.get("module", ""),
-                    "score": point.score
-                }
+        Results are reused for at most SEARCH_CACHE_TTL seconds, since a
+        resync from another process cannot clear this cache.
+        
+        Args:
+            key: Search type and parameters; results are only shared within a key
+            query: Search query
+            search: Function running the search from the query embedding
+        """
+        from semantic_cache import SemanticCache
+        
+        query_vector = self.embed_query(query)
+        cache = self._search_caches.get(key)
+        if cache is None:
+            cache = self._search_caches.setdefault(
+                key,
+                SemanticCache(
+                    threshold=SEARCH_CACHE_THRESHOLD,
+                    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+                    ttl=SEARCH_CACHE_TTL
+                )
             )
-            documents.append(doc)
         
-        return documents
+        documents = cache.get(query_vector)
+        if documents is None:
+            documents = search(query_vector)
+            cache.put(query_vector, documents)
+        return list(documents)
+    
+    def _invalidate_search_caches(self):
+        """Forget cached search results after the collection changes."""
+        self._search_caches.clear()
+        self.data_version += 1
+    
+    def similarity_search(self, query: str, k: int = 8) -> List[Document]:
+        """Perform similarity search on the vector store."""
+        return self._cached_search(
+            ("similarity", k), query, lambda vector: self.similarity_search_by_vector(vector, k=k)
+        )
+    
+    def max_marginal_relevance_search_by_vector(
+        self,
+        query_vector: List[float],
+        k: int = 8,
+        fetch_k: int = 24,
+        lambda_mult: float = 0.5
+    ) -> List[Document]:
+        """Search with maximal marginal relevance from an already-computed query embedding."""
+        import numpy as np
+        from langchain_community.vectorstores.utils import maximal_marginal_relevance
+        
+        points = self._query_points(query_vector, fetch_k, with_vectors=True)
+        if not points:
+            return []
+        
+        selected = maximal_marginal_relevance(
+            np.array(query_vector, dtype=np.float32),
+            [point.vector for point in points],
+            lambda_mult=lambda_mult,
+            k=k
+        )
+        return [self._point_to_document(points[i]) for i in selected]
+    
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 8,
+        fetch_k: int = 24,
+        lambda_mult: float = 0.5
+    ) -> List[Document]:
+        """
+        Search with maximal marginal relevance.
+        
+        Fetches fetch_k candidates with their vectors, then greedily picks k
+        of them trading off relevance to the query against similarity to the
+        chunks already picked, so near-duplicate boilerplate passages don't
+        crowd out the context.
+        
+        Args:
+            query: Search query
+            k: Number of documents to return
+            fetch_k: Number of candidates to re-rank
+            lambda_mult: 1 for pure relevance, 0 for maximum diversity
+        """
+        return self._cached_search(
+            ("mmr", k, fetch_k, lambda_mult),
+            query,
+            lambda vector: self.max_marginal_relevance_search_by_vector(
+                vector, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+            )
+        )
     
-    def get_retriever(self, search_kwargs: Optional[dict] = None):
-        """Get a retriever-like object compatible with LangChain."""
+    def get_retriever(self, search_type: str = "similarity", search_kwargs: Optional[dict] = None):
+        """
+        Get a retriever-like object compatible with LangChain.
+        
+        Retrievers are cached per (search_type, search_kwargs), so rebuilt
+        chains reuse the same instance.
+        
+        Args:
+            search_type: "similarity" or "mmr"
+            search_kwargs: k, plus fetch_k and lambda_mult for "mmr"
+        """
         from langchain_core.runnables import RunnableLambda
         
-        k = 8
-        if search_kwargs and "k" in search_kwargs:
-            k = search_kwargs["k"]
+        search_kwargs = {"k": 8, **(search_kwargs or {})}
+        key = (search_type, tuple(sorted(search_kwargs.items())))
+        if key in self._retrievers:
+            return self._retrievers[key]
+        
+        # Resolve the search once here rather than on every invoke: the
+        # closure goes straight to the cached search with a prebuilt
+        # by-vector function, the query embedding LRU still in front of it
+        k = search_kwargs["k"]
+        if search_type == "mmr":
+            fetch_k = search_kwargs.get("fetch_k", 24)
+            lambda_mult = search_kwargs.get("lambda_mult", 0.5)
+            cache_key = ("mmr", k, fetch_k, lambda_mult)
+            by_vector = self.max_marginal_relevance_search_by_vector
+            
+            def search_by_vector(vector: List[float]) -> List[Document]:
+                return by_vector(vector, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult)
+        elif search_type == "similarity":
+            cache_key = ("similarity", k)
+            by_vector = self.similarity_search_by_vector
+            
+            def search_by_vector(vector: List[float]) -> List[Document]:
+                return by_vector(vector, k=k)
+        else:
+            raise ValueError(f"search_type '{search_type}' non supporté (similarity, mmr)")
+        
+        cached_search = self._cached_search
         
         # Return a RunnableLambda for LangChain compatibility
         def retrieve(query: str) -> List[Document]:
-            return self.similarity_search(query, k=k)
+            return cached_search(cache_key, query, search_by_vector)
+        
+        retriever = self._retrievers[key] = RunnableLambda(retrieve)
+        return retriever
+    
+    def close(self):
+        """
+        Release this manager's Qdrant clients.
         
-        return RunnableLambda(retrieve)
+        The clients are shared with other managers, so their connections stay
+        open; the sync client is closed at interpreter exit.
+        """
+        self._client = None
+        self._async_client = None
     
-    def clear_collection(self):
-        """Delete all documents in the collection."""
+    def clear_collection(self, bulk: bool = False):
+        """
+        Delete all documents in the collection.
+        
+        Args:
+            bulk: Recreate it for a bulk load (see create_collection)
+        """
         client = self._get_client()
         
         if self.collection_exists():
             client.delete_collection(self.collection_name)
-            self.create_collection()
+            self._collection_known_to_exist = False
+            self._invalidate_search_caches()
+            self.create_collection(bulk=bulk)
 
 
 def create_vector_store_manager(module_config: Dict[str, Any]) -> VectorStoreManager: